@@ -0,0 +1,18 @@
+"""
+Разбиение длинных списков значений для запросов с IN (...)
+
+Запросы по множеству ID (проверки пакетов, маршруты заказов, расчет
+портфеля) выполняются блоками по IN_CHUNK_SIZE значений: каждый блок
+идет по индексу, а число параметров остается ниже лимита SQLite.
+"""
+from typing import Iterable, List, Sequence
+
+# Размер списка в одном IN (...): ниже лимита параметров SQLite
+IN_CHUNK_SIZE = 500
+
+
+def chunks(values: Sequence, size: int = IN_CHUNK_SIZE) -> Iterable[List]:
+    """Значения блоками по size (последний блок может быть короче)"""
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
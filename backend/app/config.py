@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Literal, Optional
 import os
 
 # Определяем путь к БД (в корне проекта)
@@ -12,6 +13,48 @@ class Settings(BaseSettings):
     # Database (путь к БД в корне проекта)
     DATABASE_URL: str = f"sqlite:///{DB_PATH}"
     
+    # SQLite: PRAGMA, выполняемые при открытии каждого соединения
+    SQLITE_JOURNAL_MODE: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # ожидание блокировки вместо "database is locked"
+    SQLITE_CACHE_SIZE_KB: int = 65536  # кэш страниц на соединение (64 МБ)
+    SQLITE_MMAP_SIZE: int = 268435456  # отображение файла БД в память (256 МБ)
+    SQLITE_FOREIGN_KEYS: bool = True  # роутеры записи полагаются на внешние ключи (app.integrity)
+    
+    # Пул соединений SQLAlchemy
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # секунд ожидания свободного соединения
+    DB_POOL_RECYCLE: int = -1  # секунд до пересоздания соединения (-1 - не пересоздавать)
+    
+    # Асинхронный доступ к БД (AsyncSession + aiosqlite) для роутеров чтения
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None  # по умолчанию выводится из DATABASE_URL
+    
+    # Кэш результатов калькулятора сырья (LRU + TTL)
+    CALC_CACHE_MAX_SIZE: int = 10000  # 0 - кэш отключен
+    CALC_CACHE_TTL_SECONDS: float = 300.0  # 0 - без ограничения времени жизни
+    
+    # HTTP-кэширование: max-age для редко меняющихся справочников типов (секунд)
+    REFERENCE_DATA_MAX_AGE: int = 300
+    
+    # Сжатие ответов
+    GZIP_ENABLED: bool = True
+    GZIP_MINIMUM_SIZE: int = 1000  # байт: меньшие ответы не сжимаются
+    GZIP_COMPRESS_LEVEL: int = 6
+    BROTLI_ENABLED: bool = False  # требует пакет brotli-asgi, gzip остается для остальных клиентов
+    BROTLI_QUALITY: int = 4
+    
+    # Метрики (/metrics в формате Prometheus)
+    METRICS_ENABLED: bool = True
+    N_PLUS_ONE_THRESHOLD: int = 10  # повторов одного SQL за запрос, после которых запрос считается N+1
+    
+    # Профилирование запросов по заголовку X-Profile / параметру ?profile=1
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: Optional[str] = None  # значение X-Profile-Token, без него профилирование не включается
+    PROFILING_INTERVAL: float = 0.001  # секунд между сэмплами стеков
+    PROFILING_OUTPUT_DIR: Optional[str] = None  # сохранять профили в файлы вместо ответа
+    
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
@@ -1,13 +1,70 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
 
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _is_sqlite_memory(url: str) -> bool:
+    database = make_url(url).database
+    return database in (None, "", ":memory:")
+
+def async_database_url(url: str) -> str:
+    """
+    URL для асинхронного движка: sqlite:// -> sqlite+aiosqlite://
+    """
+    parsed = make_url(url)
+    if parsed.drivername == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+def engine_options(url: str) -> dict:
+    """
+    Параметры create_engine: пул соединений и аргументы драйвера
+    """
+    options = {}
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}  # Для SQLite
+        # БД в памяти живет в одном соединении, пул для нее не настраивается
+        if _is_sqlite_memory(url):
+            return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+def configure_sqlite_connection(dbapi_connection, connection_record=None):
+    """
+    Выполнить PRAGMA из настроек для нового соединения SQLite
+
+    WAL позволяет читателям работать параллельно с записью,
+    synchronous=NORMAL в режиме WAL сохраняет целостность БД при меньшем
+    числе fsync, busy_timeout заставляет ждать блокировку вместо
+    немедленной ошибки "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        # Отрицательное значение cache_size задает размер в КиБ, а не в страницах
+        cursor.execute(f"PRAGMA cache_size = {-int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA foreign_keys = {'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}")
+    finally:
+        cursor.close()
+
 # Создание движка БД
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Для SQLite
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+if _is_sqlite(settings.DATABASE_URL):
+    event.listen(engine, "connect", configure_sqlite_connection)
 
 # Создание фабрики сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -15,6 +72,23 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Базовый класс для моделей
 Base = declarative_base()
 
+# Асинхронный движок создается только при DB_ASYNC=true
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    _async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    _async_options = engine_options(_async_url)
+    if "pool_size" in _async_options:
+        _async_options["poolclass"] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(_async_url, **_async_options)
+    if _is_sqlite(_async_url):
+        event.listen(async_engine.sync_engine, "connect", configure_sqlite_connection)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     """
     Dependency для получения сессии БД
@@ -23,4 +97,78 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """
+    Dependency для получения асинхронной сессии БД (требует DB_ASYNC=true)
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Асинхронный доступ к БД отключен (DB_ASYNC=false)")
+    async with AsyncSessionLocal() as session:
+        yield session
+
+class ReadSession:
+    """
+    Сессия для чтения с одинаковым интерфейсом в обоих режимах
+
+    При DB_ASYNC=true запросы выполняются через AsyncSession без
+    блокировки event loop. Иначе используется обычная Session, а каждый
+    запрос выполняется в пуле потоков. Методы принимают конструкции
+    select() и возвращают уже загруженные результаты.
+
+    После каждого запроса сессия закрывается и возвращает соединение
+    в пул: иначе при нехватке соединений потоки, ожидающие пул, могли бы
+    занять весь пул потоков, нужный для освобождения соединений.
+    Загруженные объекты при закрытии не сбрасываются и остаются доступны.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.is_async = not isinstance(session, Session)
+
+    async def _run(self, stmt, fetch):
+        if self.is_async:
+            try:
+                return fetch(await self.session.execute(stmt))
+            finally:
+                await self.session.close()
+
+        def run_sync():
+            try:
+                return fetch(self.session.execute(stmt))
+            finally:
+                self.session.close()
+
+        return await run_in_threadpool(run_sync)
+
+    async def all(self, stmt) -> list:
+        """Все строки результата"""
+        return await self._run(stmt, lambda result: result.all())
+
+    async def first(self, stmt):
+        """Первая строка результата или None"""
+        return await self._run(stmt, lambda result: result.first())
+
+    async def scalars(self, stmt) -> list:
+        """Первый столбец всех строк (например, ORM-объекты)"""
+        return await self._run(stmt, lambda result: result.scalars().all())
+
+    async def scalar(self, stmt):
+        """Первый столбец первой строки или None"""
+        return await self._run(stmt, lambda result: result.scalar())
+
+async def get_read_db():
+    """
+    Dependency для роутеров чтения: асинхронная или синхронная сессия
+    в зависимости от настройки DB_ASYNC
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield ReadSession(session)
+    else:
+        db = SessionLocal()
+        try:
+            yield ReadSession(db)
+        finally:
+            db.close()
\ No newline at end of file
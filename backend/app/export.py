@@ -0,0 +1,76 @@
+"""
+Потоковая выгрузка таблиц в NDJSON и CSV
+"""
+import csv
+import io
+import json
+from typing import Iterator, Literal
+
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+
+from app.database import SessionLocal
+
+ExportFormat = Literal["ndjson", "csv"]
+
+# Сколько строк читается из курсора за раз и отправляется одним блоком
+EXPORT_CHUNK_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def export_format_param(
+    format: ExportFormat = Query("ndjson", description="Формат выгрузки: ndjson или csv"),
+) -> str:
+    """Параметр формата выгрузки (dependency для роутеров)"""
+    return format
+
+
+def _ndjson_chunk(columns, rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def iter_export(query, fmt: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Выполнить select() и отдавать результат блоками по chunk_size строк
+
+    Сессия открывается внутри генератора и живет, пока идет ответ.
+    Строки читаются через yield_per, поэтому в памяти находится не
+    больше одного блока независимо от размера таблицы.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=chunk_size))
+        columns = list(result.keys())
+        if fmt == "csv":
+            # BOM, чтобы Excel открывал файл в UTF-8
+            yield "\ufeff" + _csv_chunk([columns])
+        for rows in result.partitions():
+            if fmt == "csv":
+                yield _csv_chunk(rows)
+            else:
+                yield _ndjson_chunk(columns, rows)
+    finally:
+        db.close()
+
+
+def export_response(query, fmt: str, filename: str) -> StreamingResponse:
+    """StreamingResponse с выгрузкой запроса в выбранном формате"""
+    extension = "csv" if fmt == "csv" else "ndjson"
+    return StreamingResponse(
+        iter_export(query, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
@@ -0,0 +1,51 @@
+"""
+Выбор полей ответа: ?fields=id,name
+
+Роутер перечисляет столбцы, которые можно запросить, а dependency
+возвращает выбранные из них. Запрос строится как select() только по этим
+столбцам, и строки сериализуются напрямую (app.responses), без загрузки
+ORM-объектов. id и version возвращаются всегда: по ним строятся курсоры
+страниц, ссылки на записи и If-Match при изменении.
+"""
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+
+
+class FieldSet:
+    """
+    Поля, которые можно запросить через параметр fields
+
+    Args:
+        columns: Столбцы ответа по умолчанию (имя поля - column.key),
+            первый из них - id
+    """
+
+    def __init__(self, columns: Sequence):
+        self.columns = {column.key: column for column in columns}
+        self.required = {columns[0].key} | ({"version"} & set(self.columns))
+
+    def select(self, fields: Optional[str]) -> Tuple:
+        """Столбцы для значения параметра fields (все, если он не передан)"""
+        if not fields:
+            return tuple(self.columns.values())
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(self.columns)
+        if unknown:
+            allowed = ", ".join(self.columns)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {allowed}",
+            )
+        requested |= self.required
+        # Порядок полей в ответе - как в схеме, а не как в запросе
+        return tuple(column for key, column in self.columns.items() if key in requested)
+
+    def dependency(self):
+        """Dependency для роутера: параметр fields -> кортеж столбцов"""
+        description = f"Поля ответа через запятую (id и version - всегда). Доступны: {', '.join(self.columns)}"
+
+        def dependency(fields: Optional[str] = Query(None, description=description)) -> Tuple:
+            return self.select(fields)
+
+        return dependency
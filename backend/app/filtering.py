@@ -0,0 +1,146 @@
+"""
+Фильтрация и сортировка списков по разрешенным полям
+
+Каждый роутер описывает поля, по которым можно фильтровать и
+сортировать, и операторы для них:
+
+    product_filters = ListFilter(
+        filters={"min_price": (Product.min_price, ("eq", "gte", "lte"))},
+        sort={"min_price": Product.min_price},
+        id_column=Product.id,
+    )
+
+Из описания строятся query-параметры (min_price, min_price__gte, ...,
+sort=-min_price), которые видны в OpenAPI. Условия добавляются в тот же
+SELECT, что читает страницу, поэтому фильтр не требует загрузки списка.
+Фильтровать и сортировать можно только по описанным полям, и для каждого
+из них есть индекс (см. app.migrations).
+"""
+import inspect
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+
+# Операторы: суффикс параметра -> построение условия
+OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "in": lambda column, values: column.in_(values),
+}
+
+# Разделитель значений оператора in: main_material__in=МДФ,Фанера
+IN_SEPARATOR = ","
+
+
+def _param_name(field: str, operator: str) -> str:
+    return field if operator == "eq" else f"{field}__{operator}"
+
+
+class FilterParams:
+    """Разобранные условия и сортировка одного запроса"""
+
+    def __init__(self, conditions: list, order_by: Tuple):
+        self.conditions = conditions
+        self.order_by = order_by
+
+    def apply(self, query):
+        """Добавить условия фильтра к запросу (select() или запрос COUNT)"""
+        return query.where(*self.conditions) if self.conditions else query
+
+
+class ListFilter:
+    """
+    Описание фильтров и сортировки списка
+
+    Args:
+        filters: Поле -> (столбец, разрешенные операторы)
+        sort: Поле -> столбец, по которому разрешена сортировка (id - всегда)
+        id_column: Столбец id - дополнительный ключ сортировки для
+            стабильного порядка при равных значениях
+    """
+
+    def __init__(
+        self,
+        filters: Dict[str, Tuple[object, Sequence[str]]],
+        sort: Dict[str, object],
+        id_column,
+    ):
+        self.filters = filters
+        self.id_column = id_column
+        self.sort_columns = {"id": id_column, **sort}
+
+    def _parse(self, field: str, operator: str, raw):
+        column = self.filters[field][0]
+        if operator != "in":
+            return raw
+        python_type = column.type.python_type
+        try:
+            return [python_type(value.strip()) for value in raw.split(IN_SEPARATOR) if value.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid value for {field}__in")
+
+    def _order_by(self, sort: Optional[str]) -> Tuple:
+        if not sort:
+            return ()
+        clauses = []
+        fields = []
+        for key in sort.split(","):
+            key = key.strip()
+            descending = key.startswith("-")
+            field = key[1:] if descending else key
+            if field not in self.sort_columns:
+                allowed = ", ".join(self.sort_columns)
+                raise HTTPException(status_code=400, detail=f"Cannot sort by '{field}'. Allowed: {allowed}")
+            column = self.sort_columns[field]
+            clauses.append(column.desc() if descending else column.asc())
+            fields.append(field)
+        # id в том же направлении, что и первый ключ: порядок (значение, id)
+        # совпадает с порядком индекса по значению и сортировка идет по индексу
+        if "id" not in fields:
+            first_descending = sort.strip().startswith("-")
+            clauses.append(self.id_column.desc() if first_descending else self.id_column.asc())
+        return tuple(clauses)
+
+    def dependency(self):
+        """Dependency для роутера: query-параметры фильтров и sort"""
+        parameters = []
+        for field, (column, operators) in self.filters.items():
+            python_type = column.type.python_type
+            for operator in operators:
+                annotation = Optional[str] if operator == "in" else Optional[python_type]
+                description = (
+                    f"Значения {field} через запятую" if operator == "in"
+                    else f"{field} {operator}"
+                )
+                parameters.append(inspect.Parameter(
+                    _param_name(field, operator),
+                    inspect.Parameter.KEYWORD_ONLY,
+                    default=Query(None, description=description),
+                    annotation=annotation,
+                ))
+        parameters.append(inspect.Parameter(
+            "sort",
+            inspect.Parameter.KEYWORD_ONLY,
+            default=Query(
+                None,
+                description=f"Поля сортировки через запятую, '-' - по убыванию. Разрешены: {', '.join(self.sort_columns)}",
+            ),
+            annotation=Optional[str],
+        ))
+
+        def dependency(**values) -> FilterParams:
+            conditions: List = []
+            for field, (column, operators) in self.filters.items():
+                for operator in operators:
+                    raw = values.get(_param_name(field, operator))
+                    if raw is None:
+                        continue
+                    conditions.append(OPERATORS[operator](column, self._parse(field, operator, raw)))
+            return FilterParams(conditions, self._order_by(values.get("sort")))
+
+        dependency.__signature__ = inspect.Signature(parameters, return_annotation=FilterParams)
+        return dependency
@@ -0,0 +1,153 @@
+"""
+Условные GET-запросы: ETag / If-None-Match и Last-Modified / If-Modified-Since
+
+ETag строится по счетчикам изменений таблиц из table_versions (их
+увеличивают триггеры, см. app.migrations), поэтому проверка выполняется
+одним запросом к маленькой таблице без ORM и без чтения данных. Если
+клиент прислал совпадающий ETag, endpoint не выполняется и возвращается
+304 Not Modified.
+
+Такой ETag слабый (W/"..."): он описывает данные, а не байты ответа,
+и одинаков для тел, сжатых gzip/brotli и несжатых.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.database import engine
+
+# Справочники типов меняются редко: клиенты могут не перепроверять их max-age секунд
+REFERENCE_CACHE_CONTROL = f"public, max-age={settings.REFERENCE_DATA_MAX_AGE}"
+# Остальные данные можно хранить, но перед использованием нужно перепроверить
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+_VERSIONS_QUERY = text(
+    "SELECT table_name, version, modified_at FROM table_versions WHERE table_name IN :tables"
+).bindparams(bindparam("tables", expanding=True))
+
+
+def read_table_versions(tables: Tuple[str, ...]) -> Optional[List[tuple]]:
+    """Счетчики изменений таблиц или None, если table_versions еще не создана"""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(_VERSIONS_QUERY, {"tables": list(tables)}).all()
+    except OperationalError:
+        return None
+
+
+def _parse_modified_at(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc)
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Слабое сравнение, как требует RFC 9110 для If-None-Match"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(_opaque_tag(tag) == _opaque_tag(etag) for tag in candidates)
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # Last-Modified передается с точностью до секунды
+    return last_modified.replace(microsecond=0) <= since
+
+
+def versions_conditional_get(
+    request: Request,
+    response: Response,
+    versions: Optional[List[tuple]],
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+) -> None:
+    """
+    Заголовки кэширования по счетчикам таблиц versions (см. read_table_versions)
+
+    Записывает ETag, Last-Modified и Cache-Control в ответ; при совпадении
+    If-None-Match (или If-Modified-Since, если ETag не передан) прерывает
+    обработку ответом 304. Роуты, тело которых берется из кэша в памяти,
+    передают счетчики, с которыми был загружен кэш, чтобы ETag всегда
+    соответствовал телу ответа.
+    """
+    if not versions:
+        response.headers["Cache-Control"] = cache_control
+        return
+
+    raw = ";".join(f"{name}:{version}:{modified_at}" for name, version, modified_at in sorted(versions))
+    etag = 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+    last_modified = max(_parse_modified_at(modified_at) for _, _, modified_at in versions)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.replace(microsecond=0), usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        not_modified = if_modified_since is not None and _not_modified_since(if_modified_since, last_modified)
+    if not_modified:
+        raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+
+
+def conditional_get(*tables: str, cache_control: str = DEFAULT_CACHE_CONTROL):
+    """
+    Dependency для GET-роутов, данные которых зависят от таблиц tables
+
+    Подключается через dependencies=[Depends(...)] в декораторе роута,
+    чтобы выполниться до открытия сессии БД (см. versions_conditional_get).
+    """
+    def dependency(request: Request, response: Response) -> None:
+        versions_conditional_get(request, response, read_table_versions(tables), cache_control)
+
+    return dependency
+
+
+def row_etag(version: int, columns: Iterable) -> str:
+    """
+    ETag записи: "<version>-<хэш полей>"
+
+    Набор полей (?fields=) входит в ETag, поэтому ответы с разными
+    полями одной версии записи не подменяют друг друга в кэше.
+    """
+    fields = ",".join(sorted(column.key for column in columns))
+    return f'"{version}-{hashlib.sha1(fields.encode()).hexdigest()[:8]}"'
+
+
+def row_conditional_get(
+    request: Request,
+    response: Response,
+    version: int,
+    columns: Iterable,
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+) -> None:
+    """
+    ETag карточки записи по ее версии и полям ответа columns
+
+    Тот же ETag клиент передает в If-Match при изменении записи
+    (см. app.versioning). При совпадении If-None-Match - ответ 304.
+    """
+    etag = row_etag(version, columns)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
@@ -0,0 +1,65 @@
+"""
+Ответы 400 по нарушениям ограничений БД
+
+Роутеры записи не проверяют заранее существование связанных записей и
+уникальность: INSERT/UPDATE выполняется сразу, а ограничения схемы
+(внешние ключи при PRAGMA foreign_keys=ON, UNIQUE) отклоняют
+некорректные данные. IntegrityError переводится в тот же ответ 400, что
+раньше давала предварительная проверка. Так запись занимает один запрос
+к БД вместо двух-четырех, и между проверкой и записью нет гонки.
+"""
+from typing import Iterable, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# Коды SQLSTATE (PostgreSQL) и тексты ошибок SQLite
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def _violation(error: IntegrityError) -> Optional[str]:
+    """'unique', 'foreign_key' или None для остальных ограничений"""
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    message = str(error.orig)
+    if code == UNIQUE_VIOLATION or "UNIQUE constraint failed" in message:
+        return "unique"
+    if code == FOREIGN_KEY_VIOLATION or "FOREIGN KEY constraint failed" in message:
+        return "foreign_key"
+    return None
+
+
+def integrity_error_response(
+    db: Session,
+    error: IntegrityError,
+    unique_detail: Optional[str] = None,
+    references: Iterable[Tuple[type, Optional[int], str]] = (),
+) -> HTTPException:
+    """
+    HTTPException 400 для нарушения ограничения (транзакция откатывается)
+
+    SQLite не сообщает, какой внешний ключ нарушен, поэтому ссылки из
+    references проверяются по очереди - только после ошибки, а не перед
+    каждой записью.
+
+    Args:
+        db: Сессия, в которой выполнялась запись
+        error: Исключение IntegrityError
+        unique_detail: Ответ при нарушении уникальности
+        references: (модель, id, ответ, если записи с таким id нет)
+
+    Raises:
+        IntegrityError: Если нарушено другое ограничение (NOT NULL, CHECK)
+    """
+    db.rollback()
+    violation = _violation(error)
+    if violation == "unique" and unique_detail:
+        return HTTPException(status_code=400, detail=unique_detail)
+    if violation == "foreign_key":
+        for model, record_id, detail in references:
+            if record_id is not None and db.get(model, record_id) is None:
+                return HTTPException(status_code=400, detail=detail)
+        # Связанную запись успели создать после ошибки - запись можно повторить
+        return HTTPException(status_code=400, detail="Related record not found")
+    raise error
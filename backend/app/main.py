@@ -1,5 +1,11 @@
+from contextlib import asynccontextmanager
+
+import logging
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.routers import (
     material_type,
@@ -8,12 +14,39 @@ from app.routers import (
     product,
     product_workshop,
     material_calculator,
+    stats,
+    data_import,
+    schedule,
 )
+from app import profiling
+from app.config import settings
+from app.database import async_engine, engine
+from app.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, instrument_engine, metrics
+from app.migrations import migrate_engine
+from app.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.responses import ORJSONResponse
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # brotli-asgi не установлен - используется только gzip
+    BrotliMiddleware = None
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Приводим схему существующей БД к текущим моделям перед запуском"""
+    migrate_engine(engine)
+    yield
+
 
 app = FastAPI(
     title="Production Management API",
     description="API для управления производством",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Настройка CORS
@@ -23,8 +56,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, "ETag"],
 )
 
+# Сжатие ответов больше GZIP_MINIMUM_SIZE байт
+if settings.BROTLI_ENABLED and BrotliMiddleware is None:
+    logger.warning("BROTLI_ENABLED=true, но пакет brotli-asgi не установлен: используется gzip")
+if settings.BROTLI_ENABLED and BrotliMiddleware is not None:
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=settings.BROTLI_QUALITY,
+        minimum_size=settings.GZIP_MINIMUM_SIZE,
+        gzip_fallback=settings.GZIP_ENABLED,
+    )
+elif settings.GZIP_ENABLED:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.GZIP_MINIMUM_SIZE,
+        compresslevel=settings.GZIP_COMPRESS_LEVEL,
+    )
+
+# Профилирование по требованию (только с токеном администратора)
+if settings.PROFILING_ENABLED and not settings.PROFILING_TOKEN:
+    logger.warning("PROFILING_ENABLED=true, но PROFILING_TOKEN не задан: профилирование отключено")
+elif settings.PROFILING_ENABLED:
+    profiling.instrument_engine(engine)
+    if async_engine is not None:
+        profiling.instrument_engine(async_engine.sync_engine)
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+# Метрики добавляются последними, чтобы время включало сжатие и CORS
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+
 # Подключение роутеров
 app.include_router(material_type.router)
 app.include_router(product_type.router)
@@ -32,6 +99,9 @@ app.include_router(workshop.router)
 app.include_router(product.router)
 app.include_router(product_workshop.router)
 app.include_router(material_calculator.router)
+app.include_router(stats.router)
+app.include_router(data_import.router)
+app.include_router(schedule.router)
 
 @app.get("/")
 def root():
@@ -47,10 +117,19 @@ def root():
             "products": "/api/products",
             "product_workshops": "/api/product-workshops",
             "calculator": "/api/calculator",
+            "stats": "/api/stats",
+            "import": "/api/import/{table}",
+            "schedule": "/api/schedule",
+            "metrics": "/metrics",
         }
     }
 
 @app.get("/health")
 def health_check():
     """Проверка здоровья API"""
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics_endpoint():
+    """Метрики в текстовом формате Prometheus"""
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
\ No newline at end of file
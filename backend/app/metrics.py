@@ -0,0 +1,233 @@
+"""
+Метрики запросов: время ответа по роутам, количество и время SQL-запросов
+
+Middleware измеряет время обработки каждого запроса и группирует его по
+шаблону пути роута ("/api/products/{product_id}"), а не по фактическому
+URL. События SQLAlchemy before/after_cursor_execute считают выполненные
+SQL-запросы и время в БД для текущего HTTP-запроса (через contextvars).
+Если один и тот же SQL выполнен в рамках запроса N_PLUS_ONE_THRESHOLD
+раз и больше, запрос отмечается как вероятный N+1.
+
+Метрики отдаются в текстовом формате Prometheus на /metrics.
+"""
+import logging
+import threading
+import time
+from collections import Counter as _Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограмм
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 25, 50, 100, 250)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(labelnames: Sequence[str], labels: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(labelnames, labels)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Счетчик с метками"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """Гистограмма с накопительными корзинами, как в клиентах Prometheus"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # метки -> (количество по корзинам, сумма, количество)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][index] += 1
+                break
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (bucket_counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            yield f"{self.name}_bucket{inf} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total!r}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}"
+
+
+@dataclass
+class RequestQueryStats:
+    """SQL-запросы, выполненные при обработке одного HTTP-запроса"""
+    count: int = 0
+    seconds: float = 0.0
+    statements: _Counter = field(default_factory=_Counter)
+
+    def repeated_statement(self, threshold: int) -> Optional[Tuple[str, int]]:
+        """Самый частый SQL, если он выполнен threshold раз и больше"""
+        if not self.statements:
+            return None
+        statement, repeats = self.statements.most_common(1)[0]
+        return (statement, repeats) if repeats >= threshold else None
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+class MetricsRegistry:
+    """Метрики приложения (потокобезопасно: sync-роуты работают в пуле потоков)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        labels = ("method", "route")
+        self.requests = Counter(
+            "http_requests_total", "HTTP requests by route and status code", labels + ("status",)
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds", "HTTP request latency by route", labels, LATENCY_BUCKETS
+        )
+        self.queries = Histogram(
+            "db_queries_per_request", "SQL statements executed per HTTP request", labels, QUERY_COUNT_BUCKETS
+        )
+        self.db_seconds = Counter(
+            "db_query_seconds_total", "Time spent executing SQL statements by route", labels
+        )
+        self.n_plus_one = Counter(
+            "db_n_plus_one_requests_total",
+            "Requests that executed the same SQL statement at least N_PLUS_ONE_THRESHOLD times",
+            labels,
+        )
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestQueryStats) -> None:
+        labels = (method, route)
+        repeated = stats.repeated_statement(settings.N_PLUS_ONE_THRESHOLD)
+        with self._lock:
+            self.requests.inc(labels + (str(status),))
+            self.latency.observe(labels, seconds)
+            self.queries.observe(labels, stats.count)
+            self.db_seconds.inc(labels, stats.seconds)
+            if repeated:
+                self.n_plus_one.inc(labels)
+        if repeated:
+            statement, repeats = repeated
+            logger.warning(
+                "Возможный N+1: %s %s выполнил один и тот же SQL %d раз: %s",
+                method, route, repeats, " ".join(statement.split())[:200],
+            )
+
+    def render(self) -> str:
+        with self._lock:
+            lines: List[str] = []
+            for metric in (self.requests, self.latency, self.queries, self.db_seconds, self.n_plus_one):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+        stats.statements[statement] += 1
+
+
+def instrument_engine(engine) -> None:
+    """Подключить подсчет SQL-запросов к движку (sync_engine для AsyncEngine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: время ответа и SQL-запросы по роутам
+
+    Роут определяется после обработки запроса по scope["route"], который
+    заполняет маршрутизатор FastAPI, поэтому метки не зависят от ID в URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_stats.reset(token)
+            route = scope.get("route")
+            metrics.record(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                elapsed,
+                stats,
+            )
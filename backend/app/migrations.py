@@ -0,0 +1,268 @@
+"""
+Миграции схемы существующей БД SQLite
+
+Каждый шаг идемпотентен, поэтому миграции выполняются при каждом
+запуске API и могут безопасно запускаться повторно вручную:
+
+    cd backend
+    python -m app.migrations                      # БД из настроек
+    python -m app.migrations ../production_db.sqlite
+    python -m app.migrations --check              # проверить планы запросов
+"""
+import argparse
+import sqlite3
+import sys
+from typing import Callable, List, Tuple
+
+
+def _add_foreign_key_indexes(cursor) -> None:
+    """Индексы на внешние ключи и артикул продукции"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_products_product_type_id ON products (product_type_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_products_article ON products (article)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_product_workshops_product_id ON product_workshops (product_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_product_workshops_workshop_id ON product_workshops (workshop_id)")
+
+
+def _add_filter_indexes(cursor) -> None:
+    """Индексы на поля фильтров и сортировки списков (см. app.filtering)"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_products_min_price ON products (min_price)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_products_main_material ON products (main_material)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_workshops_workshop_type ON workshops (workshop_type)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_workshops_staff_count ON workshops (staff_count)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_product_workshops_production_time_hours "
+        "ON product_workshops (production_time_hours)"
+    )
+
+
+# Таблицы, изменения которых учитываются в table_versions
+VERSIONED_TABLES = ["material_type", "product_type", "workshops", "products", "product_workshops"]
+
+
+def _add_table_versions(cursor) -> None:
+    """
+    Счетчик изменений и время последнего изменения по каждой таблице
+
+    Триггеры увеличивают счетчик при любой вставке, изменении и удалении,
+    в том числе сделанных в обход API (импорт, другой процесс). По счетчику
+    API строит ETag и Last-Modified для условных GET-запросов.
+    """
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS table_versions ("
+        "table_name TEXT PRIMARY KEY, "
+        "version INTEGER NOT NULL DEFAULT 0, "
+        "modified_at TEXT NOT NULL)"
+    )
+    for table in VERSIONED_TABLES:
+        cursor.execute(
+            "INSERT OR IGNORE INTO table_versions (table_name, version, modified_at) "
+            "VALUES (?, 0, strftime('%Y-%m-%d %H:%M:%f', 'now'))",
+            (table,),
+        )
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation.lower()}_version "
+                f"AFTER {operation} ON {table} BEGIN "
+                f"UPDATE table_versions SET version = version + 1, "
+                f"modified_at = strftime('%Y-%m-%d %H:%M:%f', 'now') "
+                f"WHERE table_name = '{table}'; END"
+            )
+
+
+# Столбцы продукции в полнотекстовом индексе products_fts
+PRODUCT_SEARCH_COLUMNS = ["name", "article", "main_material"]
+
+
+def _add_product_search(cursor) -> None:
+    """
+    Полнотекстовый индекс FTS5 по названию, артикулу и материалу продукции
+
+    Индекс хранит только токены (content='products'), сами значения
+    читаются из products. Триггеры обновляют индекс при любых изменениях
+    продукции; при создании индекс заполняется по существующим данным.
+    Префиксные индексы на 2-4 символа ускоряют поиск по началу слова.
+    Если SQLite собран без FTS5, шаг пропускается.
+    """
+    options = {row[0] for row in cursor.execute("PRAGMA compile_options").fetchall()}
+    if "ENABLE_FTS5" not in options:
+        return
+
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+    ).fetchone()
+    columns = ", ".join(PRODUCT_SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in PRODUCT_SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in PRODUCT_SEARCH_COLUMNS)
+    if not exists:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE products_fts USING fts5({columns}, "
+            "content='products', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+        )
+        cursor.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+    cursor.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_products_fts_insert AFTER INSERT ON products BEGIN "
+        f"INSERT INTO products_fts (rowid, {columns}) VALUES (new.id, {new_values}); END"
+    )
+    cursor.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_products_fts_delete AFTER DELETE ON products BEGIN "
+        f"INSERT INTO products_fts (products_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS trg_products_fts_update AFTER UPDATE OF {columns} ON products BEGIN "
+        f"INSERT INTO products_fts (products_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO products_fts (rowid, {columns}) VALUES (new.id, {new_values}); END"
+    )
+
+
+def _add_row_versions(cursor) -> None:
+    """
+    Столбец version в каждой таблице для оптимистичной блокировки
+
+    API увеличивает version в том же UPDATE, что меняет запись. Триггер
+    увеличивает ее при остальных изменениях (пакетная загрузка, импорт,
+    другой процесс), чтобы они тоже приводили к конфликту If-Match.
+    """
+    for table in VERSIONED_TABLES:
+        columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+        if "version" not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_row_version "
+            f"AFTER UPDATE ON {table} WHEN new.version = old.version BEGIN "
+            f"UPDATE {table} SET version = old.version + 1 WHERE id = new.id; END"
+        )
+
+
+# Шаги миграций в порядке применения
+MIGRATIONS: List[Tuple[str, Callable]] = [
+    ("add_foreign_key_indexes", _add_foreign_key_indexes),
+    ("add_table_versions", _add_table_versions),
+    ("add_product_search", _add_product_search),
+    ("add_filter_indexes", _add_filter_indexes),
+    ("add_row_versions", _add_row_versions),
+]
+
+# Ключевые запросы, которые должны выполняться по индексу
+INDEXED_QUERIES: List[Tuple[str, str]] = [
+    ("Продукция по типу продукции",
+     "SELECT * FROM products WHERE product_type_id = 1"),
+    ("Продукция по артикулу",
+     "SELECT * FROM products WHERE article = '1549922'"),
+    ("Цеха продукта",
+     "SELECT * FROM product_workshops WHERE product_id = 1"),
+    ("Продукция цеха",
+     "SELECT * FROM product_workshops WHERE workshop_id = 1"),
+    ("JOIN связей с цехами для продукта",
+     "SELECT w.name, pw.production_time_hours FROM product_workshops pw "
+     "JOIN workshops w ON pw.workshop_id = w.id WHERE pw.product_id = 1"),
+    ("JOIN продукции с типами по типу продукции",
+     "SELECT p.name, pt.name FROM products p "
+     "JOIN product_type pt ON p.product_type_id = pt.id WHERE pt.id = 1"),
+    ("Продукция по диапазону цены с сортировкой по убыванию",
+     "SELECT * FROM products WHERE min_price >= 1000 ORDER BY min_price DESC, id DESC LIMIT 100"),
+    ("Продукция по списку материалов",
+     "SELECT * FROM products WHERE main_material IN ('Фанера', 'МДФ')"),
+    ("Цеха по типу",
+     "SELECT * FROM workshops WHERE workshop_type = 'Сборка'"),
+    ("Цеха по численности персонала",
+     "SELECT * FROM workshops WHERE staff_count >= 5"),
+    ("Связи с цехами по времени изготовления",
+     "SELECT * FROM product_workshops WHERE production_time_hours <= 1.5"),
+]
+
+
+def apply_migrations(connection) -> List[str]:
+    """
+    Применить все миграции в одной транзакции
+
+    Args:
+        connection: DB-API соединение с SQLite (sqlite3 или raw_connection SQLAlchemy)
+
+    Returns:
+        List[str]: Названия выполненных шагов
+    """
+    cursor = connection.cursor()
+    applied = []
+    try:
+        for name, step in MIGRATIONS:
+            step(cursor)
+            applied.append(name)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return applied
+
+
+def migrate_engine(engine) -> List[str]:
+    """Применить миграции к БД движка SQLAlchemy (только SQLite)"""
+    if engine.url.get_backend_name() != "sqlite":
+        return []
+    connection = engine.raw_connection()
+    try:
+        return apply_migrations(connection)
+    finally:
+        connection.close()
+
+
+def check_query_plans(connection) -> List[Tuple[str, List[str], bool]]:
+    """
+    Проверить через EXPLAIN QUERY PLAN, что ключевые запросы используют индексы
+
+    Returns:
+        List: (описание, строки плана, используется ли индекс) по каждому запросу
+    """
+    results = []
+    cursor = connection.cursor()
+    try:
+        for description, query in INDEXED_QUERIES:
+            plan = [row[-1] for row in cursor.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()]
+            # Полный просмотр таблицы выглядит как "SCAN <таблица>" без индекса
+            uses_index = all(
+                "USING" in step or not step.startswith("SCAN")
+                for step in plan
+            )
+            results.append((description, plan, uses_index))
+    finally:
+        cursor.close()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Миграции схемы БД SQLite")
+    parser.add_argument("database", nargs="?", help="Путь к файлу БД (по умолчанию из настроек)")
+    parser.add_argument("--check", action="store_true", help="Проверить планы ключевых запросов")
+    args = parser.parse_args()
+
+    if args.database:
+        database = args.database
+    else:
+        from sqlalchemy.engine import make_url
+        from app.config import settings
+        database = make_url(settings.DATABASE_URL).database
+
+    connection = sqlite3.connect(database)
+    try:
+        for name in apply_migrations(connection):
+            print(f"Миграция применена: {name}")
+
+        if args.check:
+            failed = 0
+            for description, plan, uses_index in check_query_plans(connection):
+                status = "OK " if uses_index else "SCAN"
+                print(f"[{status}] {description}: {'; '.join(plan)}")
+                failed += not uses_index
+            if failed:
+                print(f"Запросов без индекса: {failed}")
+                return 1
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
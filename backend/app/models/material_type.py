@@ -7,4 +7,6 @@ class MaterialType(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False, index=True)
-    loss_percentage = Column(Float, nullable=True)
\ No newline at end of file
+    loss_percentage = Column(Float, nullable=True)
+    # Версия записи для оптимистичной блокировки (If-Match), растет при каждом изменении
+    version = Column(Integer, nullable=False, default=1, server_default="1")
\ No newline at end of file
@@ -8,10 +8,12 @@ class Product(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
-    product_type_id = Column(Integer, ForeignKey("product_type.id"), nullable=True)
-    article = Column(String, nullable=True)
+    product_type_id = Column(Integer, ForeignKey("product_type.id"), nullable=True, index=True)
+    article = Column(String, nullable=True, index=True)
     min_price = Column(Float, nullable=True)
     main_material = Column(String, nullable=True)
+    # Версия записи для оптимистичной блокировки (If-Match), растет при каждом изменении
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Связи
     product_type = relationship("ProductType", backref="products")
@@ -7,9 +7,11 @@ class ProductWorkshop(Base):
     __tablename__ = "product_workshops"
     
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
-    workshop_id = Column(Integer, ForeignKey("workshops.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    workshop_id = Column(Integer, ForeignKey("workshops.id"), nullable=False, index=True)
     production_time_hours = Column(Float, nullable=True)
+    # Версия записи для оптимистичной блокировки (If-Match), растет при каждом изменении
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Связи
     product = relationship("Product", back_populates="workshops")
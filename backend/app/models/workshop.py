@@ -8,4 +8,6 @@ class Workshop(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False, index=True)
     workshop_type = Column(String, nullable=True)
-    staff_count = Column(Integer, nullable=True)
\ No newline at end of file
+    staff_count = Column(Integer, nullable=True)
+    # Версия записи для оптимистичной блокировки (If-Match), растет при каждом изменении
+    version = Column(Integer, nullable=False, default=1, server_default="1")
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Пагинация списков: курсорная (keyset) по id и совместимая skip/limit
+"""
+import base64
+import binascii
+import bisect
+import json
+from typing import Callable, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+
+# Заголовки ответа списковых endpoints
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(last_id: int) -> str:
+    """Закодировать id последней записи страницы в непрозрачный курсор"""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Раскодировать курсор, полученный из заголовка X-Next-Cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = payload["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+class PageParams:
+    """
+    Параметры страницы списка (dependency для роутеров)
+
+    Если передан cursor, выборка идет по условию id > последний id
+    предыдущей страницы (без OFFSET). Иначе работает прежний режим
+    skip/limit. В обоих режимах записи упорядочены по id, а при полной
+    странице в заголовке X-Next-Cursor возвращается курсор следующей.
+    """
+
+    def __init__(
+        self,
+        skip: int = Query(0, ge=0, description="Сколько записей пропустить (режим совместимости)"),
+        limit: int = Query(100, ge=1, description="Размер страницы"),
+        cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+        with_total: bool = Query(False, description="Вернуть общее количество в X-Total-Count"),
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.with_total = with_total
+        self.after_id = decode_cursor(cursor) if cursor else None
+        self.sorted = False
+
+    def apply(self, query, id_column, order_by: Sequence = ()):
+        """
+        Применить страницу к запросу (Query или select())
+
+        order_by - сортировка, отличная от id (см. app.filtering). Курсор
+        хранит только id, поэтому с ней работает только режим skip/limit.
+        """
+        if order_by:
+            if self.after_id is not None:
+                raise HTTPException(status_code=400, detail="Cursor pagination is not supported with sort")
+            self.sorted = True
+            return query.order_by(*order_by).offset(self.skip).limit(self.limit)
+        query = query.order_by(id_column)
+        if self.after_id is not None:
+            return query.filter(id_column > self.after_id).limit(self.limit)
+        return query.offset(self.skip).limit(self.limit)
+
+    def slice(self, items: Sequence):
+        """Применить страницу к списку в памяти, упорядоченному по id"""
+        if self.after_id is not None:
+            start = bisect.bisect_right([item.id for item in items], self.after_id)
+        else:
+            start = self.skip
+        return items[start:start + self.limit]
+
+    def set_headers(
+        self,
+        response: Response,
+        items: Sequence,
+        total: Optional[int] = None,
+        get_id: Callable = lambda item: item.id,
+    ) -> None:
+        """
+        Записать заголовки пагинации
+
+        total передается, только если with_total=true: роутер не выполняет
+        COUNT(*), когда клиенту не нужно общее количество.
+        """
+        if len(items) == self.limit and not self.sorted:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(get_id(items[-1]))
+        if self.with_total and total is not None:
+            response.headers[TOTAL_COUNT_HEADER] = str(total)
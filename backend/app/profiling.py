@@ -0,0 +1,222 @@
+"""
+Профилирование отдельных запросов по требованию
+
+Запрос с заголовком X-Profile (или параметром ?profile=1) и верным
+X-Profile-Token выполняется под сэмплирующим профилировщиком: отдельный
+поток с интервалом PROFILING_INTERVAL снимает стеки всех потоков
+(sys._current_frames), поэтому в профиль попадает и код синхронных
+роутов и сессий БД, которые работают в пуле потоков. Стеки простаивающих
+потоков (ожидание в select/очереди) отбрасываются.
+
+Результат - свернутые стеки (формат collapsed для flamegraph.pl и
+speedscope), самые "тяжелые" функции и SQL-запросы, выполненные при
+обработке запроса. Он возвращается вместо обычного ответа или, если задан
+PROFILING_OUTPUT_DIR, сохраняется в файл, а обычный ответ дополняется
+заголовком X-Profile-File.
+
+Профилирование выключено по умолчанию: PROFILING_ENABLED=true и
+PROFILING_TOKEN включают его. Одновременно профилируется один запрос:
+стеки соседних запросов тоже попали бы в результат.
+"""
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import JSONResponse
+
+from app.config import settings
+
+PROFILE_HEADER = "x-profile"
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_FILE_HEADER = "X-Profile-File"
+TOP_FUNCTIONS = 30
+
+# Файлы, в которых останавливаются простаивающие потоки
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Поток, который периодически снимает стеки остальных потоков"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Стеки в формате collapsed: "корень;...;лист количество" """
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[Dict[str, object]]:
+        """Функции по числу сэмплов: self - на вершине стека, total - где угодно в стеке"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        return [
+            {"function": label, "self": own[label], "total": count}
+            for label, count in total.most_common(limit)
+        ]
+
+
+_current_queries: ContextVar[Optional[list]] = ContextVar("profiled_queries", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_queries.get() is not None:
+        conn.info.setdefault("profile_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current_queries.get()
+    if queries is not None:
+        started = conn.info["profile_start_time"].pop()
+        queries.append({
+            "statement": " ".join(statement.split()),
+            "parameters": repr(parameters)[:500],
+            "executemany": executemany,
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+        })
+
+
+def instrument_engine(engine) -> None:
+    """Записывать SQL профилируемых запросов (sync_engine для AsyncEngine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _profile_requested(scope) -> bool:
+    value = Headers(scope=scope).get(PROFILE_HEADER)
+    if value is None:
+        value = QueryParams(scope["query_string"]).get("profile")
+    return value is not None and value.lower() not in ("", "0", "false")
+
+
+def _save_report(report: dict) -> str:
+    directory = Path(settings.PROFILING_OUTPUT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = report["path"].strip("/").replace("/", "_") or "root"
+    path = directory / f"{datetime.now():%Y%m%d-%H%M%S-%f}-{report['method']}-{slug}.json"
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return str(path)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: профилирование запросов с X-Profile / ?profile=1"""
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        token = Headers(scope=scope).get(PROFILE_TOKEN_HEADER, "")
+        if not secrets.compare_digest(token.encode(), settings.PROFILING_TOKEN.encode()):
+            response = JSONResponse({"detail": "Неверный токен профилирования"}, status_code=403)
+            await response(scope, receive, send)
+            return
+        if self._busy:
+            response = JSONResponse({"detail": "Уже выполняется другой профилируемый запрос"}, status_code=409)
+            await response(scope, receive, send)
+            return
+
+        self._busy = True
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._busy = False
+
+    async def _profile(self, scope, receive, send):
+        queries: list = []
+        messages: list = []
+        status = 500
+
+        async def capture(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            messages.append(message)
+
+        sampler = StackSampler(settings.PROFILING_INTERVAL)
+        queries_token = _current_queries.set(queries)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            sampler.stop()
+            _current_queries.reset(queries_token)
+        elapsed = time.perf_counter() - started
+
+        report = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_string": scope["query_string"].decode("latin-1"),
+            "status": status,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "interval_ms": settings.PROFILING_INTERVAL * 1000,
+            "samples": sampler.samples,
+            "sql_count": len(queries),
+            "sql_ms": round(sum(query["ms"] for query in queries), 3),
+            "sql": queries,
+            "top_functions": sampler.top_functions(),
+            "collapsed": sampler.collapsed(),
+        }
+
+        if not settings.PROFILING_OUTPUT_DIR:
+            await JSONResponse(report)(scope, receive, send)
+            return
+
+        # Отдаем обычный ответ, добавив путь к сохраненному профилю
+        saved = _save_report(report)
+        for message in messages:
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_FILE_HEADER.lower().encode(), saved.encode())
+                ]
+            await send(message)
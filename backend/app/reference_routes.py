@@ -0,0 +1,63 @@
+"""
+Чтение справочников типов (продукции и материалов) из кэша в памяти
+
+Списки и карточки типов отдаются из снимка app.services.reference_cache
+без чтения таблицы и без загрузки ORM-объектов. Перед ответом снимок
+сверяется со счетчиком table_versions (один запрос к маленькой
+таблице): если таблицу изменили в обход процесса, снимок перечитывается.
+ETag списка строится по версии таблицы, с которой загружен снимок,
+ETag карточки - по версии записи в снимке, поэтому оба всегда
+соответствуют телу ответа, а ответ 304 не требует чтения данных.
+"""
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy.orm import Session
+
+from app.http_cache import (
+    REFERENCE_CACHE_CONTROL,
+    read_table_versions,
+    row_conditional_get,
+    versions_conditional_get,
+)
+from app.pagination import PageParams
+
+
+class ReferenceReads:
+    """
+    Обработчики списка и карточки справочника
+
+    Args:
+        model: Модель справочника (таблица и столбцы ответа)
+        cache: Кэш таблицы из reference_cache (product_types, material_types)
+        not_found: Ответ 404 для карточки
+    """
+
+    def __init__(self, model, cache, not_found: str):
+        self.table = model.__tablename__
+        self.columns = model.__table__.c
+        self.cache = cache
+        self.not_found = not_found
+
+    def _snapshot(self, db: Session) -> Tuple[Optional[tuple], dict, List]:
+        versions = read_table_versions((self.table,))
+        return self.cache.snapshot(db, versions[0] if versions else None)
+
+    def list(self, request: Request, response: Response, page: PageParams, db: Session) -> List:
+        """Страница справочника с ETag по версии снимка"""
+        loaded_version, _, entries = self._snapshot(db)
+        versions_conditional_get(
+            request, response, [loaded_version] if loaded_version else None, cache_control=REFERENCE_CACHE_CONTROL
+        )
+        page_entries = page.slice(entries)
+        page.set_headers(response, page_entries, total=len(entries))
+        return page_entries
+
+    def get(self, request: Request, response: Response, record_id: int, db: Session):
+        """Запись справочника по ID с ETag по ее версии"""
+        _, entries, _ = self._snapshot(db)
+        entry = entries.get(record_id)
+        if entry is None:
+            raise HTTPException(status_code=404, detail=self.not_found)
+        row_conditional_get(request, response, entry.version, self.columns, cache_control=REFERENCE_CACHE_CONTROL)
+        return entry
@@ -0,0 +1,47 @@
+from enum import Enum
+
+from fastapi import APIRouter, File, HTTPException, UploadFile
+
+from app.database import engine
+from app.services.data_import import import_dataframe, read_table_file
+from app.services.reference_cache import reference_cache
+
+router = APIRouter(prefix="/api/import", tags=["Import"])
+
+class ImportTable(str, Enum):
+    """Таблицы, доступные для импорта"""
+    material_type = "material_type"
+    product_type = "product_type"
+    workshops = "workshops"
+    products = "products"
+    product_workshops = "product_workshops"
+
+@router.post("/{table}")
+def import_table(table: ImportTable, file: UploadFile = File(...)):
+    """
+    Импортировать Excel (.xlsx) или CSV файл в таблицу
+
+    Формат столбцов совпадает с файлами Resources/xlsx/*_import.xlsx.
+    Вставка выполняется в одной транзакции; строки с ошибками не
+    вставляются и возвращаются в rejected с номером строки файла.
+    """
+    try:
+        df = read_table_file(file.file, file.filename)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Не удалось прочитать файл: {str(e)}")
+
+    connection = engine.raw_connection()
+    try:
+        report = import_dataframe(connection, table.value, df)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        connection.close()
+
+    # Справочники типов изменились в обход роутеров - сбрасываем кэш
+    if table == ImportTable.product_type:
+        reference_cache.invalidate_product_types()
+    elif table == ImportTable.material_type:
+        reference_cache.invalidate_material_types()
+
+    return report.to_dict()
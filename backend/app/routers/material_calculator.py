@@ -1,13 +1,21 @@
 """
 API роутер для расчета сырья
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
-from app.database import get_db
-from app.services.material_calculator import calculate_material_for_product
+from app.database import ReadSession, get_db, get_read_db
+from app.http_cache import conditional_get
+from app.services.material_calculator import (
+    calculate_material_for_product,
+    calculate_material_batch,
+    calculate_material_requirements,
+)
+from app.services.reference_cache import reference_cache
+from app.services.result_cache import calculation_cache
 from app.models.product import Product
 from app.models.product_workshop import ProductWorkshop
 from app.models.workshop import Workshop
@@ -17,6 +25,10 @@ router = APIRouter(
     tags=["calculator"]
 )
 
+# ETag/Last-Modified по версиям таблиц (см. app.http_cache)
+etag_workshops_for_product = conditional_get("products", "product_workshops", "workshops")
+etag_production_time = conditional_get("products", "product_workshops")
+
 
 class MaterialCalculationRequest(BaseModel):
     """Запрос на расчет сырья"""
@@ -39,6 +51,79 @@ class MaterialCalculationResponse(BaseModel):
     message: str = Field(..., description="Сообщение о результате")
 
 
+class MaterialCalculationBatchItem(BaseModel):
+    """
+    Позиция пакетного расчета сырья
+
+    Значения не ограничиваются схемой: некорректная позиция получает
+    свою ошибку в результатах, а не ошибку 422 на весь пакет.
+    """
+    product_type_id: int = Field(..., description="ID типа продукции")
+    material_type_id: int = Field(..., description="ID типа материала")
+    quantity: int = Field(..., description="Количество продукции (больше нуля)")
+    param1: float = Field(..., description="Первый параметр, например длина (больше нуля)")
+    param2: float = Field(..., description="Второй параметр, например ширина (больше нуля)")
+
+
+class MaterialCalculationBatchRequest(BaseModel):
+    """Пакетный запрос на расчет сырья"""
+    items: List[MaterialCalculationBatchItem] = Field(..., min_length=1, description="Позиции для расчета")
+
+
+class MaterialCalculationBatchResponse(BaseModel):
+    """Ответ с результатами пакетного расчета (в порядке позиций запроса)"""
+    results: List[MaterialCalculationResponse]
+    total: int = Field(..., description="Количество позиций")
+    succeeded: int = Field(..., description="Количество успешно рассчитанных позиций")
+    failed: int = Field(..., description="Количество позиций с ошибкой")
+
+
+class MaterialRequirementLine(BaseModel):
+    """Строка портфеля заказов для расчета потребности в сырье"""
+    product_id: int = Field(..., description="ID продукции")
+    quantity: int = Field(..., gt=0, description="Количество продукции")
+    param1: float = Field(..., gt=0, description="Первый параметр (например, длина)")
+    param2: float = Field(..., gt=0, description="Второй параметр (например, ширина)")
+
+
+class MaterialRequirementsRequest(BaseModel):
+    """Запрос на расчет потребности в сырье по портфелю заказов"""
+    lines: List[MaterialRequirementLine] = Field(..., min_length=1, description="Строки заказов")
+
+
+class MaterialRequirementLineResult(BaseModel):
+    """Расчет потребности в сырье по строке заказа"""
+    index: int = Field(..., description="Номер строки в запросе (с 0)")
+    product_id: int
+    product_name: Optional[str] = None
+    material_type_id: Optional[int] = None
+    material_name: Optional[str] = None
+    quantity: int
+    param1: float
+    param2: float
+    required_material: int = Field(..., description="Необходимое количество сырья, -1 при ошибке")
+    success: bool
+    message: str
+
+
+class MaterialRequirementTotal(BaseModel):
+    """Суммарная потребность в сырье по типу материала"""
+    material_type_id: int
+    material_name: str
+    loss_percentage: float
+    required_material: int = Field(..., description="Необходимое количество сырья с учетом потерь")
+    lines_count: int = Field(..., description="Количество строк заказов с этим материалом")
+    products_quantity: int = Field(..., description="Количество продукции с этим материалом")
+
+
+class MaterialRequirementsResponse(BaseModel):
+    """Потребность в сырье по портфелю заказов"""
+    materials: List[MaterialRequirementTotal]
+    lines: List[MaterialRequirementLineResult]
+    total_lines: int
+    failed: int = Field(..., description="Количество строк с ошибкой")
+
+
 class WorkshopForProductResponse(BaseModel):
     """Цех для производства продукта"""
     workshop_id: int
@@ -48,6 +133,32 @@ class WorkshopForProductResponse(BaseModel):
     production_time_hours: float
 
 
+class TotalProductionTimeResponse(BaseModel):
+    """Общее время производства продукта"""
+    product_id: int
+    product_name: str
+    total_production_time_hours: float
+    workshops_count: int
+
+    class Config:
+        from_attributes = True
+
+
+def _production_time_query():
+    """
+    Запрос суммарного времени производства по продуктам:
+    одна строка на продукт (LEFT JOIN + GROUP BY)
+    """
+    return select(
+        Product.id.label("product_id"),
+        Product.name.label("product_name"),
+        func.coalesce(func.sum(ProductWorkshop.production_time_hours), 0.0).label("total_production_time_hours"),
+        func.count(ProductWorkshop.id).label("workshops_count"),
+    ).outerjoin(
+        ProductWorkshop, ProductWorkshop.product_id == Product.id
+    ).group_by(Product.id)
+
+
 @router.post("/calculate-material", response_model=MaterialCalculationResponse)
 def calculate_required_material(
     request: MaterialCalculationRequest,
@@ -103,10 +214,84 @@ def calculate_required_material(
         )
 
 
-@router.get("/workshops-for-product/{product_id}", response_model=List[WorkshopForProductResponse])
-def get_workshops_for_product(
-    product_id: int,
+@router.post("/calculate-material/batch", response_model=MaterialCalculationBatchResponse)
+def calculate_required_material_batch(
+    request: MaterialCalculationBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Рассчитать количество сырья для списка позиций за один запрос
+
+    Типы продукции и материалов загружаются один раз на весь пакет.
+    Ошибка в одной позиции не прерывает расчет остальных: результат
+    и сообщение возвращаются для каждой позиции в порядке запроса.
+    """
+    try:
+        results = calculate_material_batch(
+            db=db,
+            items=[item.model_dump() for item in request.items]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при расчете сырья: {str(e)}"
+        )
+
+    responses = []
+    for item, (result, error) in zip(request.items, results):
+        if error:
+            message = f"Ошибка расчета: {error}"
+        else:
+            message = f"Для производства {item.quantity} единиц продукции потребуется {result} единиц сырья"
+        responses.append(MaterialCalculationResponse(
+            required_material=result,
+            product_type_id=item.product_type_id,
+            material_type_id=item.material_type_id,
+            quantity=item.quantity,
+            param1=item.param1,
+            param2=item.param2,
+            success=result != -1,
+            message=message
+        ))
+
+    failed = sum(1 for _, error in results if error)
+    return MaterialCalculationBatchResponse(
+        results=responses,
+        total=len(responses),
+        succeeded=len(responses) - failed,
+        failed=failed
+    )
+
+
+@router.post("/material-requirements", response_model=MaterialRequirementsResponse)
+def calculate_required_material_for_orders(
+    request: MaterialRequirementsRequest,
     db: Session = Depends(get_db)
+):
+    """
+    Рассчитать потребность в сырье по портфелю заказов (MRP)
+
+    Для каждой строки коэффициент типа продукции и процент потерь
+    основного материала продукта загружаются одним запросом с JOIN
+    на весь портфель. Возвращаются итоги по типам материалов и расчет
+    по каждой строке; строки с ошибкой в итоги не входят.
+    """
+    try:
+        return calculate_material_requirements(
+            db=db,
+            lines=[line.model_dump() for line in request.lines]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при расчете потребности в сырье: {str(e)}"
+        )
+
+
+@router.get("/workshops-for-product/{product_id}", response_model=List[WorkshopForProductResponse], dependencies=[Depends(etag_workshops_for_product)])
+async def get_workshops_for_product(
+    product_id: int,
+    db: ReadSession = Depends(get_read_db)
 ):
     """
     Получить список цехов для производства конкретного продукта
@@ -114,12 +299,12 @@ def get_workshops_for_product(
     """
     try:
         # Проверяем существование продукта
-        product = db.query(Product).filter(Product.id == product_id).first()
-        if not product:
+        product_exists = await db.scalar(select(Product.id).where(Product.id == product_id))
+        if product_exists is None:
             raise HTTPException(status_code=404, detail="Продукт не найден")
         
         # Получаем цеха для данного продукта
-        workshops_query = db.query(
+        workshops_query = select(
             ProductWorkshop.workshop_id,
             Workshop.name,
             Workshop.workshop_type,
@@ -127,11 +312,11 @@ def get_workshops_for_product(
             ProductWorkshop.production_time_hours
         ).join(
             Workshop, ProductWorkshop.workshop_id == Workshop.id
-        ).filter(
+        ).where(
             ProductWorkshop.product_id == product_id
         )
         
-        workshops = workshops_query.all()
+        workshops = await db.all(workshops_query)
         
         if not workshops:
             return []
@@ -156,36 +341,56 @@ def get_workshops_for_product(
         )
 
 
-@router.get("/total-production-time/{product_id}")
-def get_total_production_time(
+@router.get("/total-production-time", response_model=List[TotalProductionTimeResponse], dependencies=[Depends(etag_production_time)])
+async def get_total_production_time_bulk(
+    product_ids: str = Query(..., description="ID продуктов через запятую или all"),
+    db: ReadSession = Depends(get_read_db)
+):
+    """
+    Рассчитать общее время производства для нескольких продуктов
+    (или для всех при product_ids=all) одним сгруппированным запросом.
+    Несуществующие ID в ответ не попадают.
+    """
+    query = _production_time_query()
+    if product_ids.strip().lower() != "all":
+        try:
+            ids = {int(value) for value in product_ids.split(",") if value.strip()}
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="product_ids должен содержать ID через запятую или значение all"
+            )
+        if not ids:
+            return []
+        query = query.where(Product.id.in_(ids))
+
+    try:
+        rows = await db.all(query.order_by(Product.id))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при расчете времени: {str(e)}"
+        )
+
+    return rows
+
+
+@router.get("/total-production-time/{product_id}", response_model=TotalProductionTimeResponse, dependencies=[Depends(etag_production_time)])
+async def get_total_production_time(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: ReadSession = Depends(get_read_db)
 ):
     """
     Рассчитать общее время производства продукта
     (сумма времени во всех цехах)
     """
     try:
-        # Проверяем существование продукта
-        product = db.query(Product).filter(Product.id == product_id).first()
-        if not product:
+        # Существование продукта, сумма времени и количество цехов - одним запросом
+        row = await db.first(_production_time_query().where(Product.id == product_id))
+        if not row:
             raise HTTPException(status_code=404, detail="Продукт не найден")
         
-        # Получаем общее время производства
-        total_time = db.query(
-            db.func.sum(ProductWorkshop.production_time_hours)
-        ).filter(
-            ProductWorkshop.product_id == product_id
-        ).scalar()
-        
-        return {
-            "product_id": product_id,
-            "product_name": product.name,
-            "total_production_time_hours": float(total_time) if total_time else 0.0,
-            "workshops_count": db.query(ProductWorkshop).filter(
-                ProductWorkshop.product_id == product_id
-            ).count()
-        }
+        return row
         
     except HTTPException:
         raise
@@ -193,4 +398,18 @@ def get_total_production_time(
         raise HTTPException(
             status_code=500,
             detail=f"Ошибка при расчете времени: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    """
+    Статистика кэшей калькулятора: справочных данных (попадания, промахи,
+    размер и поколение по каждой таблице) и результатов расчета сырья
+    (попадания, промахи, вытеснения, устаревшие записи)
+    """
+    return {
+        "reference_data": reference_cache.stats(),
+        "reference_data_version": list(reference_cache.version),
+        "results": calculation_cache.stats(),
+    }
\ No newline at end of file
@@ -1,63 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
 from app.database import get_db
+from app.http_cache import row_etag
+from app.integrity import integrity_error_response
+from app.pagination import PageParams
+from app.reference_routes import ReferenceReads
+from app.versioning import if_match_version, update_failure, versioned_update
 from app.models.material_type import MaterialType
-from app.schemas.material_type import MaterialTypeCreate, MaterialTypeResponse
+from app.services.reference_cache import reference_cache
+from app.schemas.material_type import MaterialTypeCreate, MaterialTypeResponse, MaterialTypeUpdate
 
 router = APIRouter(prefix="/api/material-types", tags=["Material Types"])
 
+# Список и карточка читаются из кэша справочников (см. app.reference_routes)
+material_type_reads = ReferenceReads(MaterialType, reference_cache.material_types, not_found="Material type not found")
+
 @router.get("/", response_model=List[MaterialTypeResponse])
-def get_material_types(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_material_types(request: Request, response: Response, page: PageParams = Depends(), db: Session = Depends(get_db)):
     """Получить список всех типов материалов"""
-    material_types = db.query(MaterialType).offset(skip).limit(limit).all()
-    return material_types
+    return material_type_reads.list(request, response, page, db)
 
 @router.get("/{material_type_id}", response_model=MaterialTypeResponse)
-def get_material_type(material_type_id: int, db: Session = Depends(get_db)):
+def get_material_type(material_type_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Получить тип материала по ID"""
-    material_type = db.query(MaterialType).filter(MaterialType.id == material_type_id).first()
-    if not material_type:
-        raise HTTPException(status_code=404, detail="Material type not found")
-    return material_type
+    return material_type_reads.get(request, response, material_type_id, db)
 
 @router.post("/", response_model=MaterialTypeResponse, status_code=201)
-def create_material_type(material_type: MaterialTypeCreate, db: Session = Depends(get_db)):
+def create_material_type(material_type: MaterialTypeCreate, response: Response, db: Session = Depends(get_db)):
     """Создать новый тип материала"""
-    # Проверяем, существует ли уже такой тип материала
-    existing = db.query(MaterialType).filter(MaterialType.name == material_type.name).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Material type with this name already exists")
-    
-    db_material_type = MaterialType(**material_type.model_dump())
-    db.add(db_material_type)
-    db.commit()
-    db.refresh(db_material_type)
+    # Уникальность названия проверяет ограничение UNIQUE
+    try:
+        db_material_type = db.execute(
+            insert(MaterialType).values(**material_type.model_dump()).returning(*MaterialType.__table__.c)
+        ).one()
+        db.commit()
+    except IntegrityError as error:
+        raise integrity_error_response(
+            db, error, unique_detail="Material type with this name already exists"
+        ) from error
+    reference_cache.invalidate_material_types()
+    response.headers["ETag"] = row_etag(db_material_type.version, MaterialType.__table__.c)
     return db_material_type
 
-@router.put("/{material_type_id}", response_model=MaterialTypeResponse)
-def update_material_type(material_type_id: int, material_type: MaterialTypeCreate, db: Session = Depends(get_db)):
-    """Обновить тип материала"""
-    db_material_type = db.query(MaterialType).filter(MaterialType.id == material_type_id).first()
+def _update_material_type(
+    db: Session, material_type_id: int, values: dict, expected_versions: Optional[Tuple[int, ...]], response: Response
+):
+    """Изменить тип материала одним UPDATE (версия из If-Match, см. app.versioning)"""
+    # Уникальность названия проверяет ограничение UNIQUE
+    try:
+        db_material_type = versioned_update(
+            db, MaterialType, material_type_id, values, expected_versions, MaterialType.__table__.c
+        )
+        db.commit()
+    except IntegrityError as error:
+        raise integrity_error_response(
+            db, error, unique_detail="Material type with this name already exists"
+        ) from error
     if not db_material_type:
-        raise HTTPException(status_code=404, detail="Material type not found")
-    
-    # Проверяем уникальность имени (исключая текущую запись)
-    existing = db.query(MaterialType).filter(
-        MaterialType.name == material_type.name,
-        MaterialType.id != material_type_id
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Material type with this name already exists")
-    
-    for key, value in material_type.model_dump().items():
-        setattr(db_material_type, key, value)
-    
-    db.commit()
-    db.refresh(db_material_type)
+        raise update_failure(db, MaterialType, material_type_id, "Material type", MaterialType.__table__.c)
+    reference_cache.invalidate_material_types()
+    response.headers["ETag"] = row_etag(db_material_type.version, MaterialType.__table__.c)
     return db_material_type
 
+@router.put("/{material_type_id}", response_model=MaterialTypeResponse)
+def update_material_type(
+    material_type_id: int,
+    material_type: MaterialTypeCreate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Обновить тип материала (If-Match - защита от одновременного изменения)"""
+    return _update_material_type(db, material_type_id, material_type.model_dump(), expected_versions, response)
+
+@router.patch("/{material_type_id}", response_model=MaterialTypeResponse)
+def patch_material_type(
+    material_type_id: int,
+    material_type: MaterialTypeUpdate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Изменить переданные поля типа материала"""
+    return _update_material_type(db, material_type_id, material_type.model_dump(exclude_unset=True), expected_versions, response)
+
 @router.delete("/{material_type_id}")
 def delete_material_type(material_type_id: int, db: Session = Depends(get_db)):
     """Удалить тип материала"""
@@ -67,4 +97,5 @@ def delete_material_type(material_type_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_material_type)
     db.commit()
+    reference_cache.invalidate_material_types()
     return {"message": "Material type deleted successfully"}
\ No newline at end of file
@@ -1,63 +1,216 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
-from app.database import get_db
+from app.database import ReadSession, get_db, get_read_db
+from app.http_cache import conditional_get, row_conditional_get, row_etag
+from app.export import export_format_param, export_response
+from app.fieldsets import FieldSet
+from app.integrity import integrity_error_response
+from app.filtering import FilterParams, ListFilter
+from app.pagination import PageParams
+from app.responses import row_response, rows_response
+from app.versioning import if_match_version, update_failure, versioned_update
 from app.models.product import Product
 from app.models.product_type import ProductType
-from app.schemas.product import ProductCreate, ProductResponse
+from app.schemas.bulk import BulkDeleteRequest, BulkResponse
+from app.schemas.product import (
+    ProductBulkRequest,
+    ProductCreate,
+    ProductExpandedResponse,
+    ProductResponse,
+    ProductUpdate,
+)
+from app.services.bulk_operations import bulk_delete, bulk_upsert_products
+from app.services.product_search import build_match_query, search_products_query
 
 router = APIRouter(prefix="/api/products", tags=["Products"])
 
-@router.get("/", response_model=List[ProductResponse])
-def get_products(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Получить список всей продукции"""
-    products = db.query(Product).offset(skip).limit(limit).all()
-    return products
+# ETag/Last-Modified по версиям таблиц (см. app.http_cache)
+etag_products = conditional_get("products")
+etag_products_expanded = conditional_get("products", "product_type")
+
+# Столбцы ProductResponse: списки читают их без загрузки ORM-объектов
+PRODUCT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.product_type_id,
+    Product.article,
+    Product.min_price,
+    Product.main_material,
+    Product.version,
+)
+PRODUCT_EXPANDED_COLUMNS = PRODUCT_COLUMNS + (ProductType.name.label("product_type_name"),)
+
+# Выбор полей ответа (?fields=id,name)
+product_fields = FieldSet(PRODUCT_COLUMNS).dependency()
+product_expanded_fields = FieldSet(PRODUCT_EXPANDED_COLUMNS).dependency()
+
+# Фильтры и сортировка списков (для каждого поля есть индекс)
+product_filters = ListFilter(
+    filters={
+        "product_type_id": (Product.product_type_id, ("eq", "in")),
+        "article": (Product.article, ("eq", "in")),
+        "min_price": (Product.min_price, ("gt", "gte", "lt", "lte")),
+        "main_material": (Product.main_material, ("eq", "in")),
+    },
+    sort={"name": Product.name, "min_price": Product.min_price},
+    id_column=Product.id,
+)
+filter_products = product_filters.dependency()
+
+@router.get("/", response_model=List[ProductResponse], dependencies=[Depends(etag_products)])
+async def get_products(
+    response: Response,
+    page: PageParams = Depends(),
+    filters: FilterParams = Depends(filter_products),
+    columns: Tuple = Depends(product_fields),
+    db: ReadSession = Depends(get_read_db),
+):
+    """Получить список продукции с фильтрами, сортировкой и выбором полей"""
+    query = filters.apply(select(*columns))
+    products = await db.all(page.apply(query, Product.id, filters.order_by))
+    total = await db.scalar(filters.apply(select(func.count(Product.id)))) if page.with_total else None
+    page.set_headers(response, products, total=total)
+    return rows_response(products, response)
+
+@router.get("/expanded", response_model=List[ProductExpandedResponse], dependencies=[Depends(etag_products_expanded)])
+async def get_products_expanded(
+    response: Response,
+    page: PageParams = Depends(),
+    filters: FilterParams = Depends(filter_products),
+    columns: Tuple = Depends(product_expanded_fields),
+    db: ReadSession = Depends(get_read_db),
+):
+    """Получить список продукции с названиями типов продукции (один запрос с JOIN)"""
+    query = select(*columns).outerjoin(ProductType, Product.product_type_id == ProductType.id)
+    products = await db.all(page.apply(filters.apply(query), Product.id, filters.order_by))
+    total = await db.scalar(filters.apply(select(func.count(Product.id)))) if page.with_total else None
+    page.set_headers(response, products, total=total)
+    return rows_response(products, response)
+
+@router.get("/search", response_model=List[ProductResponse], dependencies=[Depends(etag_products)])
+async def search_products(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Слова из названия, артикула или материала (поиск по началу слова)"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    columns: Tuple = Depends(product_fields),
+    db: ReadSession = Depends(get_read_db),
+):
+    """
+    Найти продукцию по названию, артикулу и основному материалу
+
+    Поиск по индексу FTS5: каждое слово запроса ищется по началу,
+    результаты упорядочены по релевантности (bm25).
+    """
+    match = build_match_query(q)
+    if match is None:
+        return []
+    try:
+        products = await db.all(search_products_query(match, columns, skip, limit))
+    except OperationalError:
+        raise HTTPException(status_code=503, detail="Full-text search is not available")
+    return rows_response(products, response)
+
+@router.get("/export")
+def export_products(fmt: str = Depends(export_format_param)):
+    """
+    Выгрузить всю продукцию потоком в NDJSON или CSV
+
+    Строки читаются из БД блоками и сразу отправляются клиенту,
+    без построения полного списка в памяти.
+    """
+    query = select(*PRODUCT_COLUMNS).order_by(Product.id)
+    return export_response(query, fmt, "products")
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(
+    product_id: int,
+    request: Request,
+    response: Response,
+    columns: Tuple = Depends(product_fields),
+    db: ReadSession = Depends(get_read_db),
+):
     """Получить продукцию по ID"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.first(select(*columns).where(Product.id == product_id))
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    row_conditional_get(request, response, product.version, columns)
+    return row_response(product, response)
 
 @router.post("/", response_model=ProductResponse, status_code=201)
-def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+def create_product(product: ProductCreate, response: Response, db: Session = Depends(get_db)):
     """Создать новую продукцию"""
-    # Проверяем, существует ли указанный тип продукции
-    if product.product_type_id:
-        product_type = db.query(ProductType).filter(ProductType.id == product.product_type_id).first()
-        if not product_type:
-            raise HTTPException(status_code=400, detail="Product type not found")
-    
-    db_product = Product(**product.model_dump())
-    db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    # Существование типа продукции проверяет внешний ключ
+    try:
+        db_product = db.execute(
+            insert(Product).values(**product.model_dump()).returning(*PRODUCT_COLUMNS)
+        ).one()
+        db.commit()
+    except IntegrityError as error:
+        raise integrity_error_response(
+            db, error, references=[(ProductType, product.product_type_id, "Product type not found")]
+        ) from error
+    response.headers["ETag"] = row_etag(db_product.version, PRODUCT_COLUMNS)
     return db_product
 
-@router.put("/{product_id}", response_model=ProductResponse)
-def update_product(product_id: int, product: ProductCreate, db: Session = Depends(get_db)):
-    """Обновить продукцию"""
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_upsert(request: ProductBulkRequest, db: Session = Depends(get_db)):
+    """
+    Создать или обновить продукцию пакетом в одной транзакции
+
+    Типы продукции и существующие записи проверяются одним запросом
+    на весь пакет; результат возвращается по каждой позиции.
+    """
+    return bulk_upsert_products(db, [item.model_dump() for item in request.items])
+
+@router.post("/bulk/delete", response_model=BulkResponse)
+def bulk_delete_products(request: BulkDeleteRequest, db: Session = Depends(get_db)):
+    """Удалить продукцию по списку ID в одной транзакции"""
+    return bulk_delete(db, Product, request.ids, "Product not found")
+
+def _update_product(
+    db: Session, product_id: int, values: dict, expected_versions: Optional[Tuple[int, ...]], response: Response
+):
+    """Изменить продукцию одним UPDATE (версия из If-Match, см. app.versioning)"""
+    # Существование типа продукции проверяет внешний ключ
+    try:
+        db_product = versioned_update(db, Product, product_id, values, expected_versions, PRODUCT_COLUMNS)
+        db.commit()
+    except IntegrityError as error:
+        raise integrity_error_response(
+            db, error, references=[(ProductType, values.get("product_type_id"), "Product type not found")]
+        ) from error
     if not db_product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    # Проверяем, существует ли указанный тип продукции
-    if product.product_type_id:
-        product_type = db.query(ProductType).filter(ProductType.id == product.product_type_id).first()
-        if not product_type:
-            raise HTTPException(status_code=400, detail="Product type not found")
-    
-    for key, value in product.model_dump().items():
-        setattr(db_product, key, value)
-    
-    db.commit()
-    db.refresh(db_product)
+        raise update_failure(db, Product, product_id, "Product", PRODUCT_COLUMNS)
+    response.headers["ETag"] = row_etag(db_product.version, PRODUCT_COLUMNS)
     return db_product
 
+@router.put("/{product_id}", response_model=ProductResponse)
+def update_product(
+    product_id: int,
+    product: ProductCreate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Обновить продукцию (If-Match - защита от одновременного изменения)"""
+    return _update_product(db, product_id, product.model_dump(), expected_versions, response)
+
+@router.patch("/{product_id}", response_model=ProductResponse)
+def patch_product(
+    product_id: int,
+    product: ProductUpdate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Изменить переданные поля продукции"""
+    return _update_product(db, product_id, product.model_dump(exclude_unset=True), expected_versions, response)
+
 @router.delete("/{product_id}")
 def delete_product(product_id: int, db: Session = Depends(get_db)):
     """Удалить продукцию"""
@@ -1,63 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
 from app.database import get_db
+from app.http_cache import row_etag
+from app.integrity import integrity_error_response
+from app.pagination import PageParams
+from app.reference_routes import ReferenceReads
+from app.versioning import if_match_version, update_failure, versioned_update
 from app.models.product_type import ProductType
-from app.schemas.product_type import ProductTypeCreate, ProductTypeResponse
+from app.services.reference_cache import reference_cache
+from app.schemas.product_type import ProductTypeCreate, ProductTypeResponse, ProductTypeUpdate
 
 router = APIRouter(prefix="/api/product-types", tags=["Product Types"])
 
+# Список и карточка читаются из кэша справочников (см. app.reference_routes)
+product_type_reads = ReferenceReads(ProductType, reference_cache.product_types, not_found="Product type not found")
+
 @router.get("/", response_model=List[ProductTypeResponse])
-def get_product_types(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_product_types(request: Request, response: Response, page: PageParams = Depends(), db: Session = Depends(get_db)):
     """Получить список всех типов продукции"""
-    product_types = db.query(ProductType).offset(skip).limit(limit).all()
-    return product_types
+    return product_type_reads.list(request, response, page, db)
 
 @router.get("/{product_type_id}", response_model=ProductTypeResponse)
-def get_product_type(product_type_id: int, db: Session = Depends(get_db)):
+def get_product_type(product_type_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Получить тип продукции по ID"""
-    product_type = db.query(ProductType).filter(ProductType.id == product_type_id).first()
-    if not product_type:
-        raise HTTPException(status_code=404, detail="Product type not found")
-    return product_type
+    return product_type_reads.get(request, response, product_type_id, db)
 
 @router.post("/", response_model=ProductTypeResponse, status_code=201)
-def create_product_type(product_type: ProductTypeCreate, db: Session = Depends(get_db)):
+def create_product_type(product_type: ProductTypeCreate, response: Response, db: Session = Depends(get_db)):
     """Создать новый тип продукции"""
-    # Проверяем, существует ли уже такой тип продукции
-    existing = db.query(ProductType).filter(ProductType.name == product_type.name).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Product type with this name already exists")
-    
-    db_product_type = ProductType(**product_type.model_dump())
-    db.add(db_product_type)
-    db.commit()
-    db.refresh(db_product_type)
+    # Уникальность названия проверяет ограничение UNIQUE
+    try:
+        db_product_type = db.execute(
+            insert(ProductType).values(**product_type.model_dump()).returning(*ProductType.__table__.c)
+        ).one()
+        db.commit()
+    except IntegrityError as error:
+        raise integrity_error_response(
+            db, error, unique_detail="Product type with this name already exists"
+        ) from error
+    reference_cache.invalidate_product_types()
+    response.headers["ETag"] = row_etag(db_product_type.version, ProductType.__table__.c)
     return db_product_type
 
-@router.put("/{product_type_id}", response_model=ProductTypeResponse)
-def update_product_type(product_type_id: int, product_type: ProductTypeCreate, db: Session = Depends(get_db)):
-    """Обновить тип продукции"""
-    db_product_type = db.query(ProductType).filter(ProductType.id == product_type_id).first()
+def _update_product_type(
+    db: Session, product_type_id: int, values: dict, expected_versions: Optional[Tuple[int, ...]], response: Response
+):
+    """Изменить тип продукции одним UPDATE (версия из If-Match, см. app.versioning)"""
+    # Уникальность названия проверяет ограничение UNIQUE
+    try:
+        db_product_type = versioned_update(
+            db, ProductType, product_type_id, values, expected_versions, ProductType.__table__.c
+        )
+        db.commit()
+    except IntegrityError as error:
+        raise integrity_error_response(
+            db, error, unique_detail="Product type with this name already exists"
+        ) from error
     if not db_product_type:
-        raise HTTPException(status_code=404, detail="Product type not found")
-    
-    # Проверяем уникальность имени (исключая текущую запись)
-    existing = db.query(ProductType).filter(
-        ProductType.name == product_type.name,
-        ProductType.id != product_type_id
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Product type with this name already exists")
-    
-    for key, value in product_type.model_dump().items():
-        setattr(db_product_type, key, value)
-    
-    db.commit()
-    db.refresh(db_product_type)
+        raise update_failure(db, ProductType, product_type_id, "Product type", ProductType.__table__.c)
+    reference_cache.invalidate_product_types()
+    response.headers["ETag"] = row_etag(db_product_type.version, ProductType.__table__.c)
     return db_product_type
 
+@router.put("/{product_type_id}", response_model=ProductTypeResponse)
+def update_product_type(
+    product_type_id: int,
+    product_type: ProductTypeCreate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Обновить тип продукции (If-Match - защита от одновременного изменения)"""
+    return _update_product_type(db, product_type_id, product_type.model_dump(), expected_versions, response)
+
+@router.patch("/{product_type_id}", response_model=ProductTypeResponse)
+def patch_product_type(
+    product_type_id: int,
+    product_type: ProductTypeUpdate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Изменить переданные поля типа продукции"""
+    return _update_product_type(db, product_type_id, product_type.model_dump(exclude_unset=True), expected_versions, response)
+
 @router.delete("/{product_type_id}")
 def delete_product_type(product_type_id: int, db: Session = Depends(get_db)):
     """Удалить тип продукции"""
@@ -67,4 +97,5 @@ def delete_product_type(product_type_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_product_type)
     db.commit()
+    reference_cache.invalidate_product_types()
     return {"message": "Product type deleted successfully"}
\ No newline at end of file
@@ -1,89 +1,210 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
-from app.database import get_db
+from app.database import ReadSession, get_db, get_read_db
+from app.http_cache import conditional_get, row_conditional_get, row_etag
+from app.export import export_format_param, export_response
+from app.fieldsets import FieldSet
+from app.integrity import integrity_error_response
+from app.filtering import FilterParams, ListFilter
+from app.pagination import PageParams
+from app.responses import row_response, rows_response
+from app.versioning import if_match_version, update_failure, versioned_update
 from app.models.product_workshop import ProductWorkshop
 from app.models.product import Product
 from app.models.workshop import Workshop
-from app.schemas.product_workshop import ProductWorkshopCreate, ProductWorkshopResponse
+from app.schemas.bulk import BulkDeleteRequest, BulkResponse
+from app.schemas.product_workshop import (
+    ProductWorkshopBulkRequest,
+    ProductWorkshopCreate,
+    ProductWorkshopResponse,
+    ProductWorkshopExpandedResponse,
+    ProductWorkshopUpdate,
+)
+from app.services.bulk_operations import bulk_delete, bulk_upsert_product_workshops
 
 router = APIRouter(prefix="/api/product-workshops", tags=["Product Workshops"])
 
-@router.get("/", response_model=List[ProductWorkshopResponse])
-def get_product_workshops(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Получить список всех связей продукции и цехов"""
-    product_workshops = db.query(ProductWorkshop).offset(skip).limit(limit).all()
-    return product_workshops
+# ETag/Last-Modified по версиям таблиц (см. app.http_cache)
+etag_product_workshops = conditional_get("product_workshops")
+etag_product_workshops_expanded = conditional_get("product_workshops", "products", "workshops")
+
+# Столбцы ProductWorkshopResponse: списки читают их без загрузки ORM-объектов
+PRODUCT_WORKSHOP_COLUMNS = (
+    ProductWorkshop.id,
+    ProductWorkshop.product_id,
+    ProductWorkshop.workshop_id,
+    ProductWorkshop.production_time_hours,
+    ProductWorkshop.version,
+)
+PRODUCT_WORKSHOP_EXPANDED_COLUMNS = PRODUCT_WORKSHOP_COLUMNS + (
+    Product.name.label("product_name"),
+    Workshop.name.label("workshop_name"),
+)
+
+# Выбор полей ответа (?fields=id,product_id)
+product_workshop_fields = FieldSet(PRODUCT_WORKSHOP_COLUMNS).dependency()
+product_workshop_expanded_fields = FieldSet(PRODUCT_WORKSHOP_EXPANDED_COLUMNS).dependency()
+
+# Фильтры и сортировка списков (для каждого поля есть индекс)
+product_workshop_filters = ListFilter(
+    filters={
+        "product_id": (ProductWorkshop.product_id, ("eq", "in")),
+        "workshop_id": (ProductWorkshop.workshop_id, ("eq", "in")),
+        "production_time_hours": (ProductWorkshop.production_time_hours, ("gte", "lte")),
+    },
+    sort={"production_time_hours": ProductWorkshop.production_time_hours},
+    id_column=ProductWorkshop.id,
+)
+filter_product_workshops = product_workshop_filters.dependency()
+
+@router.get("/", response_model=List[ProductWorkshopResponse], dependencies=[Depends(etag_product_workshops)])
+async def get_product_workshops(
+    response: Response,
+    page: PageParams = Depends(),
+    filters: FilterParams = Depends(filter_product_workshops),
+    columns: Tuple = Depends(product_workshop_fields),
+    db: ReadSession = Depends(get_read_db),
+):
+    """Получить список связей продукции и цехов с фильтрами, сортировкой и выбором полей"""
+    query = filters.apply(select(*columns))
+    product_workshops = await db.all(page.apply(query, ProductWorkshop.id, filters.order_by))
+    total = await db.scalar(filters.apply(select(func.count(ProductWorkshop.id)))) if page.with_total else None
+    page.set_headers(response, product_workshops, total=total)
+    return rows_response(product_workshops, response)
+
+@router.get("/expanded", response_model=List[ProductWorkshopExpandedResponse], dependencies=[Depends(etag_product_workshops_expanded)])
+async def get_product_workshops_expanded(
+    response: Response,
+    page: PageParams = Depends(),
+    filters: FilterParams = Depends(filter_product_workshops),
+    columns: Tuple = Depends(product_workshop_expanded_fields),
+    db: ReadSession = Depends(get_read_db),
+):
+    """Получить список связей с названиями продукции и цехов (один запрос с JOIN)"""
+    query = select(*columns).outerjoin(
+        Product, ProductWorkshop.product_id == Product.id
+    ).outerjoin(
+        Workshop, ProductWorkshop.workshop_id == Workshop.id
+    )
+    product_workshops = await db.all(page.apply(filters.apply(query), ProductWorkshop.id, filters.order_by))
+    total = await db.scalar(filters.apply(select(func.count(ProductWorkshop.id)))) if page.with_total else None
+    page.set_headers(response, product_workshops, total=total)
+    return rows_response(product_workshops, response)
+
+@router.get("/export")
+def export_product_workshops(fmt: str = Depends(export_format_param)):
+    """
+    Выгрузить все связи продукции и цехов потоком в NDJSON или CSV
+
+    Строки читаются из БД блоками и сразу отправляются клиенту,
+    без построения полного списка в памяти.
+    """
+    query = select(*PRODUCT_WORKSHOP_COLUMNS).order_by(ProductWorkshop.id)
+    return export_response(query, fmt, "product_workshops")
 
 @router.get("/{product_workshop_id}", response_model=ProductWorkshopResponse)
-def get_product_workshop(product_workshop_id: int, db: Session = Depends(get_db)):
+async def get_product_workshop(
+    product_workshop_id: int,
+    request: Request,
+    response: Response,
+    columns: Tuple = Depends(product_workshop_fields),
+    db: ReadSession = Depends(get_read_db),
+):
     """Получить связь продукции и цеха по ID"""
-    product_workshop = db.query(ProductWorkshop).filter(ProductWorkshop.id == product_workshop_id).first()
+    product_workshop = await db.first(select(*columns).where(ProductWorkshop.id == product_workshop_id))
     if not product_workshop:
         raise HTTPException(status_code=404, detail="Product workshop relationship not found")
-    return product_workshop
+    row_conditional_get(request, response, product_workshop.version, columns)
+    return row_response(product_workshop, response)
+
+def _link_integrity_error(db: Session, error: IntegrityError, values: dict):
+    """Ответ 400 для нарушения внешнего ключа или уникальности связи"""
+    return integrity_error_response(
+        db,
+        error,
+        unique_detail="Product workshop relationship already exists",
+        references=[
+            (Product, values.get("product_id"), "Product not found"),
+            (Workshop, values.get("workshop_id"), "Workshop not found"),
+        ],
+    )
 
 @router.post("/", response_model=ProductWorkshopResponse, status_code=201)
-def create_product_workshop(product_workshop: ProductWorkshopCreate, db: Session = Depends(get_db)):
+def create_product_workshop(product_workshop: ProductWorkshopCreate, response: Response, db: Session = Depends(get_db)):
     """Создать новую связь продукции и цеха"""
-    # Проверяем, существует ли продукция
-    product = db.query(Product).filter(Product.id == product_workshop.product_id).first()
-    if not product:
-        raise HTTPException(status_code=400, detail="Product not found")
-    
-    # Проверяем, существует ли цех
-    workshop = db.query(Workshop).filter(Workshop.id == product_workshop.workshop_id).first()
-    if not workshop:
-        raise HTTPException(status_code=400, detail="Workshop not found")
-    
-    # Проверяем, не существует ли уже такая связь
-    existing = db.query(ProductWorkshop).filter(
-        ProductWorkshop.product_id == product_workshop.product_id,
-        ProductWorkshop.workshop_id == product_workshop.workshop_id
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Product workshop relationship already exists")
-    
-    db_product_workshop = ProductWorkshop(**product_workshop.model_dump())
-    db.add(db_product_workshop)
-    db.commit()
-    db.refresh(db_product_workshop)
+    # Продукцию и цех проверяют внешние ключи, повтор связи - ограничение UNIQUE
+    try:
+        db_product_workshop = db.execute(
+            insert(ProductWorkshop).values(**product_workshop.model_dump())
+            .returning(*PRODUCT_WORKSHOP_COLUMNS)
+        ).one()
+        db.commit()
+    except IntegrityError as error:
+        raise _link_integrity_error(db, error, product_workshop.model_dump()) from error
+    response.headers["ETag"] = row_etag(db_product_workshop.version, PRODUCT_WORKSHOP_COLUMNS)
     return db_product_workshop
 
-@router.put("/{product_workshop_id}", response_model=ProductWorkshopResponse)
-def update_product_workshop(product_workshop_id: int, product_workshop: ProductWorkshopCreate, db: Session = Depends(get_db)):
-    """Обновить связь продукции и цеха"""
-    db_product_workshop = db.query(ProductWorkshop).filter(ProductWorkshop.id == product_workshop_id).first()
+@router.post("/bulk", response_model=BulkResponse)
+def bulk_upsert(request: ProductWorkshopBulkRequest, db: Session = Depends(get_db)):
+    """
+    Создать или обновить связи продукции и цехов пакетом в одной транзакции
+
+    Продукция, цеха и существующие связи проверяются одним запросом
+    на весь пакет; результат возвращается по каждой позиции.
+    """
+    return bulk_upsert_product_workshops(db, [item.model_dump() for item in request.items])
+
+@router.post("/bulk/delete", response_model=BulkResponse)
+def bulk_delete_product_workshops(request: BulkDeleteRequest, db: Session = Depends(get_db)):
+    """Удалить связи продукции и цехов по списку ID в одной транзакции"""
+    return bulk_delete(db, ProductWorkshop, request.ids, "Product workshop relationship not found")
+
+def _update_product_workshop(
+    db: Session, product_workshop_id: int, values: dict, expected_versions: Optional[Tuple[int, ...]], response: Response
+):
+    """Изменить связь одним UPDATE (версия из If-Match, см. app.versioning)"""
+    try:
+        db_product_workshop = versioned_update(
+            db, ProductWorkshop, product_workshop_id, values, expected_versions, PRODUCT_WORKSHOP_COLUMNS
+        )
+        db.commit()
+    except IntegrityError as error:
+        raise _link_integrity_error(db, error, values) from error
     if not db_product_workshop:
-        raise HTTPException(status_code=404, detail="Product workshop relationship not found")
-    
-    # Проверяем, существует ли продукция
-    product = db.query(Product).filter(Product.id == product_workshop.product_id).first()
-    if not product:
-        raise HTTPException(status_code=400, detail="Product not found")
-    
-    # Проверяем, существует ли цех
-    workshop = db.query(Workshop).filter(Workshop.id == product_workshop.workshop_id).first()
-    if not workshop:
-        raise HTTPException(status_code=400, detail="Workshop not found")
-    
-    # Проверяем уникальность связи (исключая текущую запись)
-    existing = db.query(ProductWorkshop).filter(
-        ProductWorkshop.product_id == product_workshop.product_id,
-        ProductWorkshop.workshop_id == product_workshop.workshop_id,
-        ProductWorkshop.id != product_workshop_id
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Product workshop relationship already exists")
-    
-    for key, value in product_workshop.model_dump().items():
-        setattr(db_product_workshop, key, value)
-    
-    db.commit()
-    db.refresh(db_product_workshop)
+        raise update_failure(db, ProductWorkshop, product_workshop_id, "Product workshop relationship", PRODUCT_WORKSHOP_COLUMNS)
+    response.headers["ETag"] = row_etag(db_product_workshop.version, PRODUCT_WORKSHOP_COLUMNS)
     return db_product_workshop
 
+@router.put("/{product_workshop_id}", response_model=ProductWorkshopResponse)
+def update_product_workshop(
+    product_workshop_id: int,
+    product_workshop: ProductWorkshopCreate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Обновить связь продукции и цеха (If-Match - защита от одновременного изменения)"""
+    return _update_product_workshop(
+        db, product_workshop_id, product_workshop.model_dump(), expected_versions, response
+    )
+
+@router.patch("/{product_workshop_id}", response_model=ProductWorkshopResponse)
+def patch_product_workshop(
+    product_workshop_id: int,
+    product_workshop: ProductWorkshopUpdate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Изменить переданные поля связи продукции и цеха"""
+    return _update_product_workshop(
+        db, product_workshop_id, product_workshop.model_dump(exclude_unset=True), expected_versions, response
+    )
+
 @router.delete("/{product_workshop_id}")
 def delete_product_workshop(product_workshop_id: int, db: Session = Depends(get_db)):
     """Удалить связь продукции и цеха"""
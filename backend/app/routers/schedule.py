@@ -0,0 +1,34 @@
+"""
+API роутер для планирования производства
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas.schedule import ScheduleRequest, ScheduleResponse
+from app.services.scheduler import schedule_orders
+
+router = APIRouter(prefix="/api/schedule", tags=["Schedule"])
+
+@router.post("", response_model=ScheduleResponse)
+def build_schedule(request: ScheduleRequest, db: Session = Depends(get_db)):
+    """
+    Построить расписание выполнения заказов по цехам
+
+    Операции заказа выполняются по цехам продукта последовательно,
+    цех одновременно выполняет staff_count / staff_per_line операций.
+    Заказы планируются в порядке сроков выполнения. Заказы продукции
+    без цехов или с цехом без персонала возвращаются в unscheduled.
+    """
+    try:
+        return schedule_orders(
+            db=db,
+            orders=[order.model_dump() for order in request.orders],
+            start_at=request.start_at,
+            staff_per_line=request.staff_per_line,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при построении расписания: {str(e)}"
+        )
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.http_cache import conditional_get
+from app.migrations import VERSIONED_TABLES
+from app.models.material_type import MaterialType
+from app.models.product_type import ProductType
+from app.models.workshop import Workshop
+from app.models.product import Product
+from app.models.product_workshop import ProductWorkshop
+from app.schemas.stats import StatsResponse
+
+router = APIRouter(prefix="/api/stats", tags=["Statistics"])
+
+# ETag/Last-Modified по версиям таблиц (см. app.http_cache)
+etag_all_tables = conditional_get(*VERSIONED_TABLES)
+
+@router.get("/", response_model=StatsResponse, dependencies=[Depends(etag_all_tables)])
+def get_stats(db: Session = Depends(get_db)):
+    """
+    Получить статистику для панели управления
+
+    Все значения считаются агрегатными функциями SQL (COUNT, SUM, AVG)
+    без загрузки строк таблиц в ORM-объекты.
+    """
+    # Количество записей во всех таблицах одним запросом
+    counts = db.execute(select(
+        select(func.count(MaterialType.id)).scalar_subquery().label("material_types"),
+        select(func.count(ProductType.id)).scalar_subquery().label("product_types"),
+        select(func.count(Workshop.id)).scalar_subquery().label("workshops"),
+        select(func.count(Product.id)).scalar_subquery().label("products"),
+        select(func.count(ProductWorkshop.id)).scalar_subquery().label("product_workshops"),
+    )).one()
+
+    # Суммарное время производства по цехам
+    workshop_hours = db.query(
+        Workshop.id.label("workshop_id"),
+        Workshop.name.label("workshop_name"),
+        func.coalesce(func.sum(ProductWorkshop.production_time_hours), 0.0).label("total_production_time_hours"),
+        func.count(ProductWorkshop.id).label("products_count"),
+    ).outerjoin(
+        ProductWorkshop, ProductWorkshop.workshop_id == Workshop.id
+    ).group_by(Workshop.id).order_by(Workshop.id).all()
+
+    # Средняя цена продукции по типам продукции
+    product_type_prices = db.query(
+        ProductType.id.label("product_type_id"),
+        ProductType.name.label("product_type_name"),
+        func.avg(Product.min_price).label("average_min_price"),
+        func.count(Product.id).label("products_count"),
+    ).outerjoin(
+        Product, Product.product_type_id == ProductType.id
+    ).group_by(ProductType.id).order_by(ProductType.id).all()
+
+    # Количество продукции по основному материалу
+    material_products = db.query(
+        Product.main_material.label("main_material"),
+        func.count(Product.id).label("products_count"),
+    ).group_by(Product.main_material).order_by(Product.main_material).all()
+
+    return {
+        "counts": counts._asdict(),
+        "workshop_hours": workshop_hours,
+        "product_type_prices": product_type_prices,
+        "material_products": material_products,
+    }
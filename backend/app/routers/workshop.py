@@ -1,63 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 
-from app.database import get_db
+from app.database import ReadSession, get_db, get_read_db
+from app.http_cache import conditional_get, row_conditional_get, row_etag
+from app.fieldsets import FieldSet
+from app.integrity import integrity_error_response
+from app.filtering import FilterParams, ListFilter
+from app.pagination import PageParams
+from app.responses import row_response, rows_response
+from app.versioning import if_match_version, update_failure, versioned_update
 from app.models.workshop import Workshop
-from app.schemas.workshop import WorkshopCreate, WorkshopResponse
+from app.schemas.workshop import WorkshopCreate, WorkshopResponse, WorkshopUpdate
 
 router = APIRouter(prefix="/api/workshops", tags=["Workshops"])
 
-@router.get("/", response_model=List[WorkshopResponse])
-def get_workshops(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Получить список всех цехов"""
-    workshops = db.query(Workshop).offset(skip).limit(limit).all()
-    return workshops
+# ETag/Last-Modified по версиям таблиц (см. app.http_cache)
+etag_workshops = conditional_get("workshops")
+
+# Столбцы WorkshopResponse: список читает их без загрузки ORM-объектов
+WORKSHOP_COLUMNS = (Workshop.id, Workshop.name, Workshop.workshop_type, Workshop.staff_count, Workshop.version)
+
+# Выбор полей ответа (?fields=id,name)
+workshop_fields = FieldSet(WORKSHOP_COLUMNS).dependency()
+
+# Фильтры и сортировка списка (для каждого поля есть индекс)
+workshop_filters = ListFilter(
+    filters={
+        "workshop_type": (Workshop.workshop_type, ("eq", "in")),
+        "staff_count": (Workshop.staff_count, ("eq", "gte", "lte")),
+    },
+    sort={"name": Workshop.name, "staff_count": Workshop.staff_count},
+    id_column=Workshop.id,
+)
+filter_workshops = workshop_filters.dependency()
+
+@router.get("/", response_model=List[WorkshopResponse], dependencies=[Depends(etag_workshops)])
+async def get_workshops(
+    response: Response,
+    page: PageParams = Depends(),
+    filters: FilterParams = Depends(filter_workshops),
+    columns: Tuple = Depends(workshop_fields),
+    db: ReadSession = Depends(get_read_db),
+):
+    """Получить список цехов с фильтрами, сортировкой и выбором полей"""
+    query = filters.apply(select(*columns))
+    workshops = await db.all(page.apply(query, Workshop.id, filters.order_by))
+    total = await db.scalar(filters.apply(select(func.count(Workshop.id)))) if page.with_total else None
+    page.set_headers(response, workshops, total=total)
+    return rows_response(workshops, response)
 
 @router.get("/{workshop_id}", response_model=WorkshopResponse)
-def get_workshop(workshop_id: int, db: Session = Depends(get_db)):
+async def get_workshop(
+    workshop_id: int,
+    request: Request,
+    response: Response,
+    columns: Tuple = Depends(workshop_fields),
+    db: ReadSession = Depends(get_read_db),
+):
     """Получить цех по ID"""
-    workshop = db.query(Workshop).filter(Workshop.id == workshop_id).first()
+    workshop = await db.first(select(*columns).where(Workshop.id == workshop_id))
     if not workshop:
         raise HTTPException(status_code=404, detail="Workshop not found")
-    return workshop
+    row_conditional_get(request, response, workshop.version, columns)
+    return row_response(workshop, response)
 
 @router.post("/", response_model=WorkshopResponse, status_code=201)
-def create_workshop(workshop: WorkshopCreate, db: Session = Depends(get_db)):
+def create_workshop(workshop: WorkshopCreate, response: Response, db: Session = Depends(get_db)):
     """Создать новый цех"""
-    # Проверяем, существует ли уже такой цех
-    existing = db.query(Workshop).filter(Workshop.name == workshop.name).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Workshop with this name already exists")
-    
-    db_workshop = Workshop(**workshop.model_dump())
-    db.add(db_workshop)
-    db.commit()
-    db.refresh(db_workshop)
+    # Уникальность названия проверяет ограничение UNIQUE
+    try:
+        db_workshop = db.execute(
+            insert(Workshop).values(**workshop.model_dump()).returning(*WORKSHOP_COLUMNS)
+        ).one()
+        db.commit()
+    except IntegrityError as error:
+        raise integrity_error_response(
+            db, error, unique_detail="Workshop with this name already exists"
+        ) from error
+    response.headers["ETag"] = row_etag(db_workshop.version, WORKSHOP_COLUMNS)
     return db_workshop
 
-@router.put("/{workshop_id}", response_model=WorkshopResponse)
-def update_workshop(workshop_id: int, workshop: WorkshopCreate, db: Session = Depends(get_db)):
-    """Обновить цех"""
-    db_workshop = db.query(Workshop).filter(Workshop.id == workshop_id).first()
+def _update_workshop(
+    db: Session, workshop_id: int, values: dict, expected_versions: Optional[Tuple[int, ...]], response: Response
+):
+    """Изменить цех одним UPDATE (версия из If-Match, см. app.versioning)"""
+    # Уникальность названия проверяет ограничение UNIQUE
+    try:
+        db_workshop = versioned_update(db, Workshop, workshop_id, values, expected_versions, WORKSHOP_COLUMNS)
+        db.commit()
+    except IntegrityError as error:
+        raise integrity_error_response(
+            db, error, unique_detail="Workshop with this name already exists"
+        ) from error
     if not db_workshop:
-        raise HTTPException(status_code=404, detail="Workshop not found")
-    
-    # Проверяем уникальность имени (исключая текущую запись)
-    existing = db.query(Workshop).filter(
-        Workshop.name == workshop.name,
-        Workshop.id != workshop_id
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Workshop with this name already exists")
-    
-    for key, value in workshop.model_dump().items():
-        setattr(db_workshop, key, value)
-    
-    db.commit()
-    db.refresh(db_workshop)
+        raise update_failure(db, Workshop, workshop_id, "Workshop", WORKSHOP_COLUMNS)
+    response.headers["ETag"] = row_etag(db_workshop.version, WORKSHOP_COLUMNS)
     return db_workshop
 
+@router.put("/{workshop_id}", response_model=WorkshopResponse)
+def update_workshop(
+    workshop_id: int,
+    workshop: WorkshopCreate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Обновить цех (If-Match - защита от одновременного изменения)"""
+    return _update_workshop(db, workshop_id, workshop.model_dump(), expected_versions, response)
+
+@router.patch("/{workshop_id}", response_model=WorkshopResponse)
+def patch_workshop(
+    workshop_id: int,
+    workshop: WorkshopUpdate,
+    response: Response,
+    expected_versions: Optional[Tuple[int, ...]] = Depends(if_match_version),
+    db: Session = Depends(get_db),
+):
+    """Изменить переданные поля цеха"""
+    return _update_workshop(db, workshop_id, workshop.model_dump(exclude_unset=True), expected_versions, response)
+
 @router.delete("/{workshop_id}")
 def delete_workshop(workshop_id: int, db: Session = Depends(get_db)):
     """Удалить цех"""
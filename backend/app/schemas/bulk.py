@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+class BulkItemResult(BaseModel):
+    """Результат обработки одной позиции пакета"""
+    index: int = Field(..., description="Номер позиции в запросе (с 0)")
+    status: Literal["created", "updated", "deleted", "error"]
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BulkResponse(BaseModel):
+    """Ответ пакетной операции (результаты в порядке позиций запроса)"""
+    results: List[BulkItemResult]
+    total: int
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+
+class BulkDeleteRequest(BaseModel):
+    """Пакетное удаление по ID"""
+    ids: List[int] = Field(..., min_length=1)
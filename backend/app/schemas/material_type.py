@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 
 class MaterialTypeBase(BaseModel):
@@ -10,9 +10,22 @@ class MaterialTypeCreate(MaterialTypeBase):
     """Схема для создания типа материала"""
     pass
 
+class MaterialTypeUpdate(BaseModel):
+    """Схема частичного обновления типа материала (PATCH): передаются только изменяемые поля"""
+    name: Optional[str] = None
+    loss_percentage: Optional[float] = None
+
+    @field_validator('name')
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("field cannot be null")
+        return value
+
 class MaterialTypeResponse(MaterialTypeBase):
     """Схема ответа с типом материала"""
     id: int
+    version: int
     
     class Config:
         from_attributes = True
\ No newline at end of file
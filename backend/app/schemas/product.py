@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
 
 class ProductBase(BaseModel):
     """Базовая схема продукции"""
@@ -13,9 +13,42 @@ class ProductCreate(ProductBase):
     """Схема для создания продукции"""
     pass
 
+class ProductUpdate(BaseModel):
+    """Схема частичного обновления продукции (PATCH): передаются только изменяемые поля"""
+    name: Optional[str] = None
+    product_type_id: Optional[int] = None
+    article: Optional[str] = None
+    min_price: Optional[float] = None
+    main_material: Optional[str] = None
+
+    @field_validator('name')
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("field cannot be null")
+        return value
+
 class ProductResponse(ProductBase):
     """Схема ответа с продукцией"""
     id: int
+    version: int
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProductExpandedResponse(ProductResponse):
+    """Схема ответа с продукцией и названием типа продукции"""
+    product_type_name: Optional[str] = None
+
+class ProductBulkItem(ProductBase):
+    """
+    Позиция пакетной загрузки продукции
+
+    С id обновляется существующая продукция, без id - продукция с тем же
+    артикулом, а если такой нет, создается новая.
+    """
+    id: Optional[int] = None
+
+class ProductBulkRequest(BaseModel):
+    """Пакет продукции для создания/обновления"""
+    items: List[ProductBulkItem] = Field(..., min_length=1)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 
 class ProductTypeBase(BaseModel):
@@ -10,9 +10,22 @@ class ProductTypeCreate(ProductTypeBase):
     """Схема для создания типа продукции"""
     pass
 
+class ProductTypeUpdate(BaseModel):
+    """Схема частичного обновления типа продукции (PATCH): передаются только изменяемые поля"""
+    name: Optional[str] = None
+    coefficient: Optional[float] = None
+
+    @field_validator('name')
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("field cannot be null")
+        return value
+
 class ProductTypeResponse(ProductTypeBase):
     """Схема ответа с типом продукции"""
     id: int
+    version: int
     
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
 
 class ProductWorkshopBase(BaseModel):
     """Базовая схема связи продукции и цеха"""
@@ -11,9 +11,35 @@ class ProductWorkshopCreate(ProductWorkshopBase):
     """Схема для создания связи продукции и цеха"""
     pass
 
+class ProductWorkshopUpdate(BaseModel):
+    """Схема частичного обновления связи продукции и цеха (PATCH): передаются только изменяемые поля"""
+    product_id: Optional[int] = None
+    workshop_id: Optional[int] = None
+    production_time_hours: Optional[float] = None
+
+    @field_validator('product_id', 'workshop_id')
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("field cannot be null")
+        return value
+
 class ProductWorkshopResponse(ProductWorkshopBase):
     """Схема ответа со связью продукции и цеха"""
     id: int
+    version: int
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProductWorkshopExpandedResponse(ProductWorkshopResponse):
+    """Схема ответа со связью продукции и цеха и их названиями"""
+    product_name: Optional[str] = None
+    workshop_name: Optional[str] = None
+
+class ProductWorkshopBulkRequest(BaseModel):
+    """
+    Пакет связей продукции и цехов для создания/обновления
+    (существующая связь с той же парой продукт-цех обновляется)
+    """
+    items: List[ProductWorkshopCreate] = Field(..., min_length=1)
\ No newline at end of file
@@ -0,0 +1,63 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class ScheduleOrder(BaseModel):
+    """Заказ на производство продукции"""
+    product_id: int
+    quantity: int = Field(..., gt=0)
+    due_date: Optional[datetime] = Field(None, description="Срок выполнения заказа")
+
+class ScheduleRequest(BaseModel):
+    """Запрос на построение расписания"""
+    orders: List[ScheduleOrder] = Field(..., min_length=1)
+    start_at: Optional[datetime] = Field(None, description="Начало планирования (по умолчанию - текущее время; без часового пояса - UTC)")
+    staff_per_line: int = Field(1, ge=1, description="Сколько сотрудников цеха занято одним заказом")
+
+class ScheduledOperation(BaseModel):
+    """Операция заказа в цехе"""
+    order_index: int
+    product_id: int
+    slot: int = Field(..., description="Номер производственной линии цеха")
+    start_hours: float
+    end_hours: float
+
+class WorkshopTimeline(BaseModel):
+    """Расписание цеха"""
+    workshop_id: int
+    workshop_name: str
+    staff_count: Optional[int] = None
+    slots: int = Field(..., description="Количество параллельных линий (staff_count // staff_per_line, 0 - цех не работает)")
+    busy_hours: float
+    utilization: float = Field(..., description="Загрузка линий цеха до окончания расписания (0..1)")
+    operations: List[ScheduledOperation]
+
+class ScheduledOrder(BaseModel):
+    """Сроки выполнения заказа"""
+    index: int = Field(..., description="Номер заказа в запросе (с 0)")
+    product_id: int
+    quantity: int
+    start_hours: float
+    end_hours: float
+    due_hours: Optional[float] = None
+    tardiness_hours: float
+    on_time: bool
+
+class UnscheduledOrder(BaseModel):
+    """Заказ, который не удалось запланировать"""
+    index: int
+    product_id: int
+    detail: str
+
+class ScheduleResponse(BaseModel):
+    """
+    Расписание производства
+
+    Время операций и заказов указано в часах от start_at.
+    """
+    start_at: datetime
+    makespan_hours: float
+    late_orders: int
+    orders: List[ScheduledOrder]
+    workshops: List[WorkshopTimeline]
+    unscheduled: List[UnscheduledOrder]
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class TableCounts(BaseModel):
+    """Количество записей в таблицах"""
+    material_types: int
+    product_types: int
+    workshops: int
+    products: int
+    product_workshops: int
+
+class WorkshopHoursStats(BaseModel):
+    """Суммарное время производства в цехе"""
+    workshop_id: int
+    workshop_name: str
+    total_production_time_hours: float
+    products_count: int
+
+class ProductTypePriceStats(BaseModel):
+    """Средняя цена продукции по типу продукции"""
+    product_type_id: int
+    product_type_name: str
+    average_min_price: Optional[float] = None
+    products_count: int
+
+class MaterialProductsStats(BaseModel):
+    """Количество продукции по основному материалу"""
+    main_material: Optional[str] = None
+    products_count: int
+
+class StatsResponse(BaseModel):
+    """Схема ответа со статистикой для панели управления"""
+    counts: TableCounts
+    workshop_hours: List[WorkshopHoursStats]
+    product_type_prices: List[ProductTypePriceStats]
+    material_products: List[MaterialProductsStats]
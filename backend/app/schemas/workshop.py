@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 
 class WorkshopBase(BaseModel):
@@ -11,9 +11,23 @@ class WorkshopCreate(WorkshopBase):
     """Схема для создания цеха"""
     pass
 
+class WorkshopUpdate(BaseModel):
+    """Схема частичного обновления цеха (PATCH): передаются только изменяемые поля"""
+    name: Optional[str] = None
+    workshop_type: Optional[str] = None
+    staff_count: Optional[int] = None
+
+    @field_validator('name')
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("field cannot be null")
+        return value
+
 class WorkshopResponse(WorkshopBase):
     """Схема ответа с цехом"""
     id: int
+    version: int
     
     class Config:
         from_attributes = True
\ No newline at end of file
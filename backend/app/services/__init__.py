@@ -1,9 +1,28 @@
 """
 Сервисы приложения
 """
-from .material_calculator import MaterialCalculatorService, calculate_material_for_product
+from .material_calculator import (
+    MaterialCalculatorService,
+    calculate_material_for_product,
+    calculate_material_batch,
+    calculate_material_requirements,
+)
+from .product_search import build_match_query, search_products_query
+from .reference_cache import ReferenceDataCache, reference_cache
+from .result_cache import LRUCache, calculation_cache
+from .scheduler import ProductionSchedulerService, schedule_orders
 
 __all__ = [
     'MaterialCalculatorService',
-    'calculate_material_for_product'
+    'calculate_material_for_product',
+    'calculate_material_batch',
+    'calculate_material_requirements',
+    'build_match_query',
+    'search_products_query',
+    'ReferenceDataCache',
+    'reference_cache',
+    'LRUCache',
+    'calculation_cache',
+    'ProductionSchedulerService',
+    'schedule_orders',
 ]
\ No newline at end of file
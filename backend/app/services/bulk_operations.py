@@ -0,0 +1,218 @@
+"""
+Пакетное создание, обновление и удаление продукции и связей с цехами
+
+Внешние ключи и уникальность проверяются запросами по множеству
+значений (IN (...)) на весь пакет, а не отдельным запросом на каждую
+позицию. Корректные позиции записываются в одной транзакции, позиции
+с ошибкой пропускаются и возвращаются со статусом error.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.chunking import chunks
+from app.models.product import Product
+from app.models.product_type import ProductType
+from app.models.product_workshop import ProductWorkshop
+from app.models.workshop import Workshop
+
+
+def _existing_ids(db: Session, id_column, ids: Iterable[int]) -> Set[int]:
+    """Какие из переданных ID есть в таблице"""
+    found: Set[int] = set()
+    for chunk in chunks(list(set(ids))):
+        found.update(db.execute(select(id_column).where(id_column.in_(chunk))).scalars())
+    return found
+
+
+def _result(index: int, status: str, entity_id: Optional[int] = None, detail: Optional[str] = None) -> dict:
+    return {"index": index, "status": status, "id": entity_id, "detail": detail}
+
+
+def _report(results: List[dict]) -> dict:
+    counts = {"created": 0, "updated": 0, "deleted": 0, "error": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return {
+        "results": results,
+        "total": len(results),
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "deleted": counts["deleted"],
+        "failed": counts["error"],
+    }
+
+
+def _insert_returning_ids(db: Session, model, rows: List[dict]) -> List[int]:
+    """Вставить строки одним пакетом и вернуть их ID в порядке rows"""
+    if not rows:
+        return []
+    return list(db.execute(
+        insert(model).returning(model.id, sort_by_parameter_order=True),
+        rows,
+    ).scalars())
+
+
+def bulk_upsert_products(db: Session, items: List[dict]) -> dict:
+    """
+    Создать или обновить продукцию пакетом
+
+    Позиция с id обновляет продукцию с этим ID, позиция без id -
+    продукцию с тем же артикулом (если она есть), иначе создается
+    новая продукция.
+
+    Args:
+        db: Сессия базы данных
+        items: Позиции (поля ProductBulkItem)
+
+    Returns:
+        dict: Результаты по позициям и количество созданных/обновленных/ошибок
+    """
+    type_ids = _existing_ids(
+        db, ProductType.id, (item["product_type_id"] for item in items if item.get("product_type_id") is not None)
+    )
+    product_ids = _existing_ids(db, Product.id, (item["id"] for item in items if item.get("id") is not None))
+
+    # Артикул -> ID существующей продукции (при повторах - первая запись)
+    articles = list({item["article"] for item in items if item.get("id") is None and item.get("article")})
+    ids_by_article: Dict[str, int] = {}
+    for chunk in chunks(articles):
+        ids_by_article.update(db.execute(
+            select(Product.article, func.min(Product.id))
+            .where(Product.article.in_(chunk))
+            .group_by(Product.article)
+        ).all())
+
+    results: List[Optional[dict]] = [None] * len(items)
+    seen_keys: Set[Tuple[str, object]] = set()
+    to_insert: List[Tuple[int, dict]] = []
+    to_update: List[Tuple[int, dict]] = []
+
+    for index, item in enumerate(items):
+        values = {key: value for key, value in item.items() if key != "id"}
+        if item.get("product_type_id") is not None and item["product_type_id"] not in type_ids:
+            results[index] = _result(index, "error", item.get("id"), "Product type not found")
+            continue
+
+        if item.get("id") is not None:
+            key = ("id", item["id"])
+            target_id = item["id"]
+            if target_id not in product_ids:
+                results[index] = _result(index, "error", target_id, "Product not found")
+                continue
+        elif item.get("article"):
+            key = ("article", item["article"])
+            target_id = ids_by_article.get(item["article"])
+        else:
+            key = None
+            target_id = None
+
+        if key is not None:
+            if key in seen_keys:
+                results[index] = _result(index, "error", target_id, "Duplicate item in request")
+                continue
+            seen_keys.add(key)
+
+        if target_id is None:
+            to_insert.append((index, values))
+        else:
+            to_update.append((index, {"id": target_id, **values}))
+
+    if to_update:
+        db.execute(update(Product), [values for _, values in to_update])
+    new_ids = _insert_returning_ids(db, Product, [values for _, values in to_insert])
+    db.commit()
+
+    for index, values in to_update:
+        results[index] = _result(index, "updated", values["id"])
+    for (index, _), new_id in zip(to_insert, new_ids):
+        results[index] = _result(index, "created", new_id)
+    return _report(results)
+
+
+def bulk_upsert_product_workshops(db: Session, items: List[dict]) -> dict:
+    """
+    Создать или обновить связи продукции и цехов пакетом
+
+    Ключ связи - пара (product_id, workshop_id): для существующей пары
+    обновляется время производства, для новой создается связь.
+
+    Args:
+        db: Сессия базы данных
+        items: Позиции (поля ProductWorkshopCreate)
+
+    Returns:
+        dict: Результаты по позициям и количество созданных/обновленных/ошибок
+    """
+    product_ids = _existing_ids(db, Product.id, (item["product_id"] for item in items))
+    workshop_ids = _existing_ids(db, Workshop.id, (item["workshop_id"] for item in items))
+
+    # Существующие связи для продуктов пакета: (product_id, workshop_id) -> id
+    link_ids: Dict[Tuple[int, int], int] = {}
+    for chunk in chunks(list(product_ids)):
+        for link_id, product_id, workshop_id in db.execute(
+            select(ProductWorkshop.id, ProductWorkshop.product_id, ProductWorkshop.workshop_id)
+            .where(ProductWorkshop.product_id.in_(chunk))
+        ):
+            link_ids[(product_id, workshop_id)] = link_id
+
+    results: List[Optional[dict]] = [None] * len(items)
+    seen_pairs: Set[Tuple[int, int]] = set()
+    to_insert: List[Tuple[int, dict]] = []
+    to_update: List[Tuple[int, dict]] = []
+
+    for index, item in enumerate(items):
+        pair = (item["product_id"], item["workshop_id"])
+        if item["product_id"] not in product_ids:
+            results[index] = _result(index, "error", None, "Product not found")
+        elif item["workshop_id"] not in workshop_ids:
+            results[index] = _result(index, "error", None, "Workshop not found")
+        elif pair in seen_pairs:
+            results[index] = _result(index, "error", link_ids.get(pair), "Duplicate item in request")
+        else:
+            seen_pairs.add(pair)
+            if pair in link_ids:
+                to_update.append((index, {
+                    "id": link_ids[pair],
+                    "production_time_hours": item.get("production_time_hours"),
+                }))
+            else:
+                to_insert.append((index, dict(item)))
+
+    if to_update:
+        db.execute(update(ProductWorkshop), [values for _, values in to_update])
+    new_ids = _insert_returning_ids(db, ProductWorkshop, [values for _, values in to_insert])
+    db.commit()
+
+    for index, values in to_update:
+        results[index] = _result(index, "updated", values["id"])
+    for (index, _), new_id in zip(to_insert, new_ids):
+        results[index] = _result(index, "created", new_id)
+    return _report(results)
+
+
+def bulk_delete(db: Session, model, ids: List[int], not_found_detail: str) -> dict:
+    """
+    Удалить записи по списку ID одной транзакцией
+
+    При удалении продукции удаляются и ее связи с цехами,
+    как и при удалении по одной записи.
+    """
+    existing = _existing_ids(db, model.id, ids)
+    to_delete = list(existing)
+    for chunk in chunks(to_delete):
+        if model is Product:
+            db.execute(delete(ProductWorkshop).where(ProductWorkshop.product_id.in_(chunk)))
+        db.execute(delete(model).where(model.id.in_(chunk)))
+    db.commit()
+
+    results = []
+    deleted: Set[int] = set()
+    for index, entity_id in enumerate(ids):
+        if entity_id in existing and entity_id not in deleted:
+            deleted.add(entity_id)
+            results.append(_result(index, "deleted", entity_id))
+        else:
+            results.append(_result(index, "error", entity_id, not_found_detail))
+    return _report(results)
@@ -0,0 +1,277 @@
+"""
+Пакетный импорт справочников и продукции из Excel/CSV
+
+Строки файла обрабатываются столбцами (pandas), а не по одной:
+названия типов продукции, продукции и цехов сопоставляются с ID через
+словари, загруженные из БД одним запросом на таблицу, а вставка
+выполняется одним executemany в одной транзакции на таблицу.
+
+Запуск из командной строки (из каталога backend):
+    python -m app.services.data_import                          # все файлы из Resources/xlsx
+    python -m app.services.data_import --table products new.csv
+"""
+import argparse
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
+
+import pandas as pd
+
+# Каталог с исходными Excel-файлами (в корне проекта)
+RESOURCES_DIR = Path(__file__).resolve().parent.parent.parent.parent / "Resources" / "xlsx"
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Столбец файла и соответствующий ему столбец таблицы"""
+    source: str
+    target: str
+    kind: str = "str"  # str | float | int | lookup
+    required: bool = False
+    lookup_table: Optional[str] = None  # таблица, в которой ищется ID по имени
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """Описание импорта одной таблицы"""
+    table: str
+    file_name: str
+    columns: List[ColumnSpec]
+
+
+TABLE_SPECS: Dict[str, TableSpec] = {
+    "material_type": TableSpec("material_type", "Material_type_import.xlsx", [
+        ColumnSpec("Тип материала", "name", required=True),
+        ColumnSpec("Процент потерь сырья", "loss_percentage", "float"),
+    ]),
+    "product_type": TableSpec("product_type", "Product_type_import.xlsx", [
+        ColumnSpec("Тип продукции", "name", required=True),
+        ColumnSpec("Коэффициент типа продукции", "coefficient", "float"),
+    ]),
+    "workshops": TableSpec("workshops", "Workshops_import.xlsx", [
+        ColumnSpec("Название цеха", "name", required=True),
+        ColumnSpec("Тип цеха", "workshop_type"),
+        ColumnSpec("Количество человек для производства", "staff_count", "int"),
+    ]),
+    "products": TableSpec("products", "Products_import.xlsx", [
+        ColumnSpec("Наименование продукции", "name", required=True),
+        ColumnSpec("Тип продукции", "product_type_id", "lookup", lookup_table="product_type"),
+        ColumnSpec("Артикул", "article"),
+        ColumnSpec("Минимальная стоимость для партнера", "min_price", "float"),
+        ColumnSpec("Основной материал", "main_material"),
+    ]),
+    "product_workshops": TableSpec("product_workshops", "Product_workshops_import.xlsx", [
+        ColumnSpec("Наименование продукции", "product_id", "lookup", required=True, lookup_table="products"),
+        ColumnSpec("Название цеха", "workshop_id", "lookup", required=True, lookup_table="workshops"),
+        ColumnSpec("Время изготовления, ч", "production_time_hours", "float"),
+    ]),
+}
+
+# Порядок импорта: справочники раньше таблиц, которые на них ссылаются
+IMPORT_ORDER = ["material_type", "product_type", "workshops", "products", "product_workshops"]
+
+
+@dataclass
+class RowReject:
+    """Отклоненная строка файла"""
+    row: int  # номер строки в файле (1 - заголовок)
+    reason: str
+
+
+@dataclass
+class ImportReport:
+    """Результат импорта одной таблицы"""
+    table: str
+    total_rows: int = 0
+    inserted: int = 0
+    skipped_duplicates: int = 0
+    rejected: List[RowReject] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def read_table_file(source: Union[str, Path, BinaryIO], file_name: Optional[str] = None) -> pd.DataFrame:
+    """Прочитать Excel или CSV (по расширению имени файла)"""
+    name = file_name or str(source)
+    if name.lower().endswith(".csv"):
+        df = pd.read_csv(source)
+    else:
+        df = pd.read_excel(source)
+    # В исходных файлах встречаются заголовки с пробелами по краям
+    df.columns = [str(column).strip() for column in df.columns]
+    return df
+
+
+def _load_lookup(cursor, table: str) -> Dict[str, int]:
+    """Словарь имя -> id для таблицы (один запрос; при повторах имени - первая запись)"""
+    return dict(cursor.execute(f"SELECT name, MIN(id) FROM {table} GROUP BY name").fetchall())
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    """Текстовый столбец; целые числа (например, артикулы) без дробной части"""
+    if pd.api.types.is_float_dtype(series):
+        non_null = series.dropna()
+        if (non_null == non_null.round()).all():
+            series = series.astype("Int64")
+    # Значения не обрезаются: имена должны совпадать с уже сохраненными в БД
+    text = series.astype("string")
+    return text.where(text.notna(), None)
+
+
+def _reject(rejects: Dict[int, str], mask: pd.Series, reason: Union[str, Callable]) -> None:
+    for index in mask[mask].index:
+        if index not in rejects:
+            rejects[index] = reason(index) if callable(reason) else reason
+
+
+def prepare_rows(df: pd.DataFrame, spec: TableSpec, lookups: Dict[str, Dict[str, int]]):
+    """
+    Преобразовать DataFrame в строки для вставки
+
+    Returns:
+        tuple: (список кортежей значений, отклоненные строки)
+    """
+    rejects: Dict[int, str] = {}
+    prepared = pd.DataFrame(index=df.index)
+
+    for column in spec.columns:
+        if column.source not in df.columns:
+            raise ValueError(f"В файле нет столбца '{column.source}'")
+        source = df[column.source]
+
+        if column.kind in ("float", "int"):
+            values = pd.to_numeric(source, errors="coerce")
+            _reject(rejects, source.notna() & values.isna(),
+                    lambda i, c=column: f"{c.source}: не число '{df.at[i, c.source]}'")
+            if column.kind == "int":
+                fractional = values.notna() & (values != values.round())
+                _reject(rejects, fractional, lambda i, c=column: f"{c.source}: не целое число '{df.at[i, c.source]}'")
+                values = values.round().astype("Int64")
+        elif column.kind == "lookup":
+            names = _as_text(source)
+            # Сопоставление имен с ID - хеш-соединение со словарем из БД
+            values = names.map(lookups[column.lookup_table]).astype("Int64")
+            _reject(rejects, names.notna() & values.isna(),
+                    lambda i, c=column: f"{c.source}: '{names[i]}' не найдено")
+        else:
+            values = _as_text(source)
+
+        if column.required:
+            _reject(rejects, values.isna(), f"{column.source}: пустое значение")
+        prepared[column.target] = values
+
+    accepted = prepared.drop(index=list(rejects))
+    rows = list(zip(*(
+        accepted[column.target].astype(object).where(accepted[column.target].notna(), None).tolist()
+        for column in spec.columns
+    ))) if len(accepted) else []
+    rejected = [RowReject(row=int(index) + 2, reason=reason) for index, reason in sorted(rejects.items())]
+    return rows, rejected
+
+
+def import_dataframe(connection, table: str, df: pd.DataFrame) -> ImportReport:
+    """
+    Импортировать DataFrame в таблицу в одной транзакции
+
+    Args:
+        connection: DB-API соединение с SQLite
+        table: Название таблицы из TABLE_SPECS
+        df: Данные файла
+
+    Returns:
+        ImportReport: Количество вставленных, пропущенных и отклоненных строк
+    """
+    if table not in TABLE_SPECS:
+        raise ValueError(f"Неизвестная таблица '{table}'")
+    spec = TABLE_SPECS[table]
+    report = ImportReport(table=table, total_rows=len(df))
+
+    cursor = connection.cursor()
+    try:
+        lookups = {
+            column.lookup_table: _load_lookup(cursor, column.lookup_table)
+            for column in spec.columns if column.kind == "lookup"
+        }
+        rows, report.rejected = prepare_rows(df, spec, lookups)
+
+        if rows:
+            targets = [column.target for column in spec.columns]
+            cursor.executemany(
+                f"INSERT OR IGNORE INTO {spec.table} ({', '.join(targets)}) "
+                f"VALUES ({', '.join('?' for _ in targets)})",
+                rows,
+            )
+            report.inserted = max(cursor.rowcount, 0)
+            report.skipped_duplicates = len(rows) - report.inserted
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return report
+
+
+def import_file(connection, table: str, source: Union[str, Path, BinaryIO], file_name: Optional[str] = None) -> ImportReport:
+    """Импортировать Excel/CSV файл в таблицу"""
+    return import_dataframe(connection, table, read_table_file(source, file_name))
+
+
+def import_directory(connection, directory: Union[str, Path] = RESOURCES_DIR) -> List[ImportReport]:
+    """Импортировать все найденные файлы каталога в порядке зависимостей таблиц"""
+    directory = Path(directory)
+    reports = []
+    for table in IMPORT_ORDER:
+        path = directory / TABLE_SPECS[table].file_name
+        if path.exists():
+            reports.append(import_file(connection, table, path))
+    return reports
+
+
+def print_report(report: ImportReport, max_rejects: int = 20) -> None:
+    """Вывести результат импорта таблицы"""
+    print(f"{report.table}: строк {report.total_rows}, вставлено {report.inserted}, "
+          f"дубликатов {report.skipped_duplicates}, отклонено {len(report.rejected)}")
+    for reject in report.rejected[:max_rejects]:
+        print(f"  строка {reject.row}: {reject.reason}")
+    if len(report.rejected) > max_rejects:
+        print(f"  ... и еще {len(report.rejected) - max_rejects}")
+
+
+def main() -> int:
+    import sqlite3
+
+    parser = argparse.ArgumentParser(description="Импорт данных из Excel/CSV в БД")
+    parser.add_argument("file", nargs="?", help="Файл для импорта (вместе с --table)")
+    parser.add_argument("--table", choices=IMPORT_ORDER, help="Таблица для импорта одного файла")
+    parser.add_argument("--dir", default=str(RESOURCES_DIR), help="Каталог с файлами *_import.xlsx")
+    parser.add_argument("--db", help="Путь к файлу БД (по умолчанию из настроек)")
+    args = parser.parse_args()
+
+    if args.db:
+        database = args.db
+    else:
+        from sqlalchemy.engine import make_url
+        from app.config import settings
+        database = make_url(settings.DATABASE_URL).database
+
+    connection = sqlite3.connect(database)
+    try:
+        if args.file:
+            if not args.table:
+                parser.error("для импорта одного файла укажите --table")
+            reports = [import_file(connection, args.table, args.file)]
+        else:
+            reports = import_directory(connection, args.dir)
+    finally:
+        connection.close()
+
+    for report in reports:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
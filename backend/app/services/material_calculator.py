@@ -1,10 +1,16 @@
 """
 Сервис для расчета количества сырья для производства продукции
 """
-from typing import Optional
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.models.product_type import ProductType
+from app.chunking import chunks
 from app.models.material_type import MaterialType
+from app.models.product import Product
+from app.models.product_type import ProductType
+from app.services.reference_cache import reference_cache
+from app.services.result_cache import calculation_cache
 
 
 class MaterialCalculatorService:
@@ -39,18 +45,14 @@ class MaterialCalculatorService:
             if quantity <= 0 or param1 <= 0 or param2 <= 0:
                 return -1
             
-            # Получаем тип продукции
-            product_type = self.db.query(ProductType).filter(
-                ProductType.id == product_type_id
-            ).first()
+            # Получаем тип продукции (из кэша справочников)
+            product_type = reference_cache.get_product_type(self.db, product_type_id)
             
             if not product_type:
                 return -1
             
-            # Получаем тип материала
-            material_type = self.db.query(MaterialType).filter(
-                MaterialType.id == material_type_id
-            ).first()
+            # Получаем тип материала (из кэша справочников)
+            material_type = reference_cache.get_material_type(self.db, material_type_id)
             
             if not material_type:
                 return -1
@@ -68,13 +70,173 @@ class MaterialCalculatorService:
             total_material_with_losses = total_base_material * loss_multiplier
             
             # Возвращаем целое число (округляем вверх для гарантии достаточности)
-            import math
             return math.ceil(total_material_with_losses)
             
         except Exception as e:
             print(f"Ошибка при расчете сырья: {e}")
             return -1
 
+    def calculate_raw_material_batch(self, items: Sequence[dict]) -> List[Tuple[int, Optional[str]]]:
+        """
+        Рассчитывает количество сырья для списка позиций за один проход
+
+        Типы продукции и материалов берутся из кэша справочников
+        (без запросов к БД при заполненном кэше). Каждая позиция
+        проверяется отдельно: ошибка в одной позиции не влияет на
+        остальные.
+
+        Args:
+            items: Позиции расчета, каждая со значениями product_type_id,
+                material_type_id, quantity, param1, param2
+
+        Returns:
+            List[Tuple[int, Optional[str]]]: Для каждой позиции в порядке
+                входа - количество сырья и None либо -1 и причина ошибки
+        """
+        if not items:
+            return []
+
+        product_types = reference_cache.product_types.get_many(self.db)
+        material_types = reference_cache.material_types.get_many(self.db)
+
+        results: List[Tuple[int, Optional[str]]] = []
+        for item in items:
+            qty, p1, p2 = item["quantity"], item["param1"], item["param2"]
+            product_type = product_types.get(item["product_type_id"])
+            material_type = material_types.get(item["material_type_id"])
+            if qty <= 0:
+                error = "Количество продукции должно быть больше нуля"
+            elif p1 <= 0 or p2 <= 0:
+                error = "Параметры продукции должны быть больше нуля"
+            elif product_type is None:
+                error = "Тип продукции не найден"
+            elif material_type is None:
+                error = "Тип материала не найден"
+            elif product_type.coefficient is None:
+                error = "Для типа продукции не задан коэффициент"
+            elif material_type.loss_percentage is None:
+                error = "Для типа материала не задан процент потерь"
+            else:
+                error = None
+
+            if error:
+                results.append((-1, error))
+                continue
+            # Порядок операций совпадает с calculate_raw_material,
+            # чтобы пакетный и одиночный расчеты давали одинаковый результат
+            coef, loss = product_type.coefficient, material_type.loss_percentage
+            results.append((math.ceil(p1 * p2 * coef * qty * (1 + loss / 100)), None))
+        return results
+
+    def _load_product_materials(self, product_ids: List[int]) -> Dict[int, tuple]:
+        """
+        Коэффициент типа и материал продуктов одним запросом:
+        продукция -> тип продукции, основной материал -> тип материала (по названию)
+        """
+        query = select(
+            Product.id,
+            Product.name,
+            ProductType.coefficient,
+            MaterialType.id,
+            MaterialType.name,
+            MaterialType.loss_percentage,
+        ).outerjoin(
+            ProductType, Product.product_type_id == ProductType.id
+        ).outerjoin(
+            MaterialType, Product.main_material == MaterialType.name
+        )
+        products = {}
+        # Продукция читается по первичному ключу блоками, без просмотра всей таблицы
+        for chunk in chunks(product_ids):
+            for row in self.db.execute(query.where(Product.id.in_(chunk))):
+                products[row[0]] = tuple(row[1:])
+        return products
+
+    def calculate_material_requirements(self, lines: Sequence[dict]) -> dict:
+        """
+        Рассчитывает потребность в сырье по всему портфелю заказов
+
+        Для каждой строки (product_id, quantity, param1, param2) тип
+        продукции и материал берутся из продукта: коэффициент типа и
+        процент потерь основного материала. Потребность по строке
+        считается по той же формуле, что и calculate_raw_material,
+        и суммируется по типам материалов.
+
+        Args:
+            lines: Строки заказов (product_id, quantity, param1, param2)
+
+        Returns:
+            dict: materials - итоги по типам материалов, lines - расчет
+                по каждой строке в порядке входа (-1 для строк с ошибкой)
+        """
+        product_ids = [line["product_id"] for line in lines]
+        products = self._load_product_materials(sorted(set(product_ids)))
+
+        # Столбцы расчета
+        quantities = [line["quantity"] for line in lines]
+        params1 = [line["param1"] for line in lines]
+        params2 = [line["param2"] for line in lines]
+        resolved = [products.get(product_id) for product_id in product_ids]
+
+        line_results = []
+        materials: Dict[int, dict] = {}
+        for index, (product_id, qty, p1, p2, product) in enumerate(
+            zip(product_ids, quantities, params1, params2, resolved)
+        ):
+            product_name = coef = material_id = material_name = loss = None
+            if product is not None:
+                product_name, coef, material_id, material_name, loss = product
+
+            if product is None:
+                message = "Продукт не найден"
+            elif coef is None:
+                message = "Для типа продукции не задан коэффициент"
+            elif material_id is None or loss is None:
+                message = "Основной материал продукта не найден в справочнике материалов"
+            elif qty <= 0 or p1 <= 0 or p2 <= 0:
+                message = "Неверные данные: количество и параметры должны быть больше нуля"
+            else:
+                message = None
+
+            required = -1 if message else math.ceil(p1 * p2 * coef * qty * (1 + loss / 100))
+            line_results.append({
+                "index": index,
+                "product_id": product_id,
+                "product_name": product_name,
+                "material_type_id": material_id,
+                "material_name": material_name,
+                "quantity": qty,
+                "param1": p1,
+                "param2": p2,
+                "required_material": required,
+                "success": message is None,
+                "message": message or f"Потребуется {required} единиц сырья",
+            })
+            if message:
+                continue
+
+            total = materials.get(material_id)
+            if total is None:
+                total = materials[material_id] = {
+                    "material_type_id": material_id,
+                    "material_name": material_name,
+                    "loss_percentage": loss,
+                    "required_material": 0,
+                    "lines_count": 0,
+                    "products_quantity": 0,
+                }
+            total["required_material"] += required
+            total["lines_count"] += 1
+            total["products_quantity"] += qty
+
+        failed = sum(1 for line in line_results if not line["success"])
+        return {
+            "materials": sorted(materials.values(), key=lambda total: total["material_type_id"]),
+            "lines": line_results,
+            "total_lines": len(line_results),
+            "failed": failed,
+        }
+
 
 def calculate_material_for_product(
     db: Session,
@@ -102,11 +264,49 @@ def calculate_material_for_product(
         >>> calculate_material_for_product(db, 1, 2, 10, 1.5, 2.0)
         45  # Пример результата
     """
+    # Результат зависит только от входных данных и справочников,
+    # поэтому версия справочников входит в ключ кэша
+    key = (product_type_id, material_type_id, quantity, param1, param2, reference_cache.version)
+    calculator = MaterialCalculatorService(db)
+    return calculation_cache.get_or_compute(
+        key,
+        lambda: calculator.calculate_raw_material(
+            product_type_id=product_type_id,
+            material_type_id=material_type_id,
+            quantity=quantity,
+            param1=param1,
+            param2=param2
+        )
+    )
+
+
+def calculate_material_batch(db: Session, items: Sequence[dict]) -> List[Tuple[int, Optional[str]]]:
+    """
+    Функция-обертка для пакетного расчета сырья
+
+    Args:
+        db: Сессия базы данных
+        items: Позиции расчета (product_type_id, material_type_id,
+            quantity, param1, param2)
+
+    Returns:
+        List[Tuple[int, Optional[str]]]: Количество сырья и причина ошибки
+            (-1 и текст ошибки) для каждой позиции
+    """
+    calculator = MaterialCalculatorService(db)
+    return calculator.calculate_raw_material_batch(items)
+
+
+def calculate_material_requirements(db: Session, lines: Sequence[dict]) -> dict:
+    """
+    Функция-обертка для расчета потребности в сырье по портфелю заказов
+
+    Args:
+        db: Сессия базы данных
+        lines: Строки заказов (product_id, quantity, param1, param2)
+
+    Returns:
+        dict: Итоги по типам материалов и расчет по каждой строке
+    """
     calculator = MaterialCalculatorService(db)
-    return calculator.calculate_raw_material(
-        product_type_id=product_type_id,
-        material_type_id=material_type_id,
-        quantity=quantity,
-        param1=param1,
-        param2=param2
-    )
\ No newline at end of file
+    return calculator.calculate_material_requirements(lines)
@@ -0,0 +1,57 @@
+"""
+Сервис полнотекстового поиска продукции по индексу FTS5 products_fts
+(см. app.migrations)
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import column, func, literal_column, select, table, text
+
+from app.models.product import Product
+
+products_fts = table("products_fts", column("rowid"))
+
+# Веса столбцов в bm25: совпадение в названии важнее, чем в материале
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0)  # name, article, main_material
+
+# Токены запроса: буквы и цифры, как в токенизаторе unicode61
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """
+    Строка MATCH для FTS5 из пользовательского запроса
+
+    Запрос разбивается на слова, каждое ищется по началу (префиксу),
+    все слова должны встретиться: "стол дуб" -> "стол"* AND "дуб"*.
+    Операторы FTS5 из запроса не интерпретируются.
+
+    Returns:
+        Optional[str]: Строка MATCH или None, если в запросе нет слов
+    """
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    return " AND ".join(f'"{token}"*' for token in tokens)
+
+
+def search_products_query(match: str, columns, skip: int, limit: int):
+    """
+    select() продукции, найденной по строке MATCH, в порядке релевантности
+
+    Args:
+        match: Строка MATCH (build_match_query)
+        columns: Выбираемые столбцы продукции
+        skip: Сколько результатов пропустить
+        limit: Размер страницы
+    """
+    rank = func.bm25(literal_column("products_fts"), *SEARCH_WEIGHTS)
+    return (
+        select(*columns)
+        .select_from(products_fts)
+        .join(Product, Product.id == products_fts.c.rowid)
+        .where(text("products_fts MATCH :match").bindparams(match=match))
+        .order_by(rank, Product.id)
+        .offset(skip)
+        .limit(limit)
+    )
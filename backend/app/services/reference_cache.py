@@ -0,0 +1,209 @@
+"""
+Кэш справочных данных (типы продукции и типы материалов) в памяти процесса
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Generic, List, Optional, Tuple, Type, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.product_type import ProductType
+from app.models.material_type import MaterialType
+
+
+@dataclass(frozen=True)
+class ProductTypeEntry:
+    """Запись справочника типов продукции"""
+    id: int
+    name: str
+    coefficient: Optional[float]
+    version: int
+
+
+@dataclass(frozen=True)
+class MaterialTypeEntry:
+    """Запись справочника типов материалов"""
+    id: int
+    name: str
+    loss_percentage: Optional[float]
+    version: int
+
+
+EntryT = TypeVar("EntryT", ProductTypeEntry, MaterialTypeEntry)
+
+# Счетчик изменений таблицы (см. app.migrations._add_table_versions)
+_VERSION_QUERY = text(
+    "SELECT table_name, version, modified_at FROM table_versions WHERE table_name = :table"
+)
+
+
+class _TableCache(Generic[EntryT]):
+    """
+    Кэш одной справочной таблицы
+
+    Таблица загружается целиком при первом обращении. Инвалидация
+    увеличивает поколение, поэтому загрузка, начатая до изменения
+    данных, не сохраняет устаревший снимок. Вместе со снимком хранится
+    строка table_versions, с которой он загружен (см. snapshot).
+    """
+
+    def __init__(self, model, entry_cls: Type[EntryT], columns: List[str]):
+        self._model = model
+        self._entry_cls = entry_cls
+        self._columns = columns
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[int, EntryT]] = None
+        self._ordered: List[EntryT] = []
+        self._loaded_version: Optional[tuple] = None
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _read_version(self, db: Session) -> Optional[tuple]:
+        try:
+            row = db.execute(_VERSION_QUERY, {"table": self._model.__tablename__}).first()
+        except OperationalError:  # table_versions еще не создана
+            return None
+        return tuple(row) if row else None
+
+    def _load(self, db: Session) -> Tuple[Dict[int, EntryT], List[EntryT], Optional[tuple]]:
+        with self._lock:
+            if self._entries is not None:
+                self.hits += 1
+                return self._entries, self._ordered, self._loaded_version
+            self.misses += 1
+            generation = self.generation
+
+        # Счетчик читается до строк: если таблицу изменят между запросами,
+        # снимок окажется новее своей версии и будет перечитан при следующей
+        # проверке, но старые данные никогда не получат новую версию
+        loaded_version = self._read_version(db)
+        rows = db.query(*[getattr(self._model, name) for name in self._columns]).order_by(
+            self._model.id
+        ).all()
+        ordered = [self._entry_cls(*row) for row in rows]
+        entries = {entry.id: entry for entry in ordered}
+
+        with self._lock:
+            # Сохраняем снимок, только если за время загрузки не было записей
+            if generation == self.generation:
+                self._entries = entries
+                self._ordered = ordered
+                self._loaded_version = loaded_version
+        return entries, ordered, loaded_version
+
+    def get(self, db: Session, entry_id: int) -> Optional[EntryT]:
+        return self._load(db)[0].get(entry_id)
+
+    def get_many(self, db: Session) -> Dict[int, EntryT]:
+        return self._load(db)[0]
+
+    def list(self, db: Session) -> List[EntryT]:
+        return self._load(db)[1]
+
+    def snapshot(
+        self, db: Session, current_version: Optional[tuple]
+    ) -> Tuple[Optional[tuple], Dict[int, EntryT], List[EntryT]]:
+        """
+        Строка table_versions, с которой загружен снимок, и его записи
+        (по ID и упорядоченные по ID)
+
+        Если current_version (текущая строка table_versions) не совпадает
+        с версией снимка, таблицу изменили в обход этого процесса (другой
+        воркер, импорт скриптом) - снимок перечитывается.
+        """
+        with self._lock:
+            stale = (
+                self._entries is not None
+                and current_version is not None
+                and self._loaded_version != tuple(current_version)
+            )
+        if stale:
+            self.invalidate()
+        entries, ordered, loaded_version = self._load(db)
+        return loaded_version, entries, ordered
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries = None
+            self._ordered = []
+            self._loaded_version = None
+            self.generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries) if self._entries is not None else 0,
+                "loaded": self._entries is not None,
+                "generation": self.generation,
+            }
+
+
+class ReferenceDataCache:
+    """
+    Кэш справочников, используемых калькулятором и списками типов
+
+    Кэш локален для процесса: роутеры типов продукции и материалов
+    вызывают invalidate_* после успешного commit, поэтому изменения,
+    сделанные через API, видны сразу. Изменения в обход API (импорт
+    скриптом, другой процесс) списки и карточки типов замечают по
+    table_versions (см. _TableCache.snapshot, app.reference_routes),
+    калькулятор - после перечитывания снимка списком или invalidate_all().
+    """
+
+    def __init__(self):
+        self.product_types: _TableCache[ProductTypeEntry] = _TableCache(
+            ProductType, ProductTypeEntry, ["id", "name", "coefficient", "version"]
+        )
+        self.material_types: _TableCache[MaterialTypeEntry] = _TableCache(
+            MaterialType, MaterialTypeEntry, ["id", "name", "loss_percentage", "version"]
+        )
+
+    def get_product_type(self, db: Session, product_type_id: int) -> Optional[ProductTypeEntry]:
+        """Тип продукции по ID или None"""
+        return self.product_types.get(db, product_type_id)
+
+    def get_material_type(self, db: Session, material_type_id: int) -> Optional[MaterialTypeEntry]:
+        """Тип материала по ID или None"""
+        return self.material_types.get(db, material_type_id)
+
+    def list_product_types(self, db: Session) -> List[ProductTypeEntry]:
+        """Все типы продукции, упорядоченные по ID"""
+        return self.product_types.list(db)
+
+    def list_material_types(self, db: Session) -> List[MaterialTypeEntry]:
+        """Все типы материалов, упорядоченные по ID"""
+        return self.material_types.list(db)
+
+    @property
+    def version(self) -> tuple:
+        """
+        Версия справочных данных: меняется при каждой инвалидации,
+        то есть при любой записи через роутеры типов
+        """
+        return (self.product_types.generation, self.material_types.generation)
+
+    def invalidate_product_types(self) -> None:
+        self.product_types.invalidate()
+
+    def invalidate_material_types(self) -> None:
+        self.material_types.invalidate()
+
+    def invalidate_all(self) -> None:
+        self.invalidate_product_types()
+        self.invalidate_material_types()
+
+    def stats(self) -> dict:
+        """Счетчики попаданий и промахов по таблицам"""
+        return {
+            "product_types": self.product_types.stats(),
+            "material_types": self.material_types.stats(),
+        }
+
+
+# Единственный экземпляр кэша на процесс
+reference_cache = ReferenceDataCache()
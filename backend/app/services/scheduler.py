@@ -0,0 +1,219 @@
+"""
+Сервис планирования производства: распределение заказов по цехам
+с учетом численности персонала
+"""
+import heapq
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.chunking import chunks
+from app.models.product_workshop import ProductWorkshop
+from app.models.workshop import Workshop
+
+# Точность времени в ответе (часы), чтобы не возвращать погрешность float
+HOURS_PRECISION = 6
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Время в UTC (наивное время считается UTC)"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _hours_between(start: datetime, moment: datetime) -> float:
+    """Часы от start до moment (оба приводятся к UTC)"""
+    return (_as_utc(moment) - _as_utc(start)).total_seconds() / 3600
+
+
+class ProductionSchedulerService:
+    """
+    Списочный планировщик (list scheduling) заказов по цехам
+
+    Маршрут продукта - его связи с цехами в порядке создания связей,
+    операции заказа выполняются по маршруту последовательно. Цех
+    содержит staff_count / staff_per_line параллельных линий; операция
+    занимает одну линию на production_time_hours * quantity часов.
+
+    Заказы обрабатываются в порядке сроков (EDD), каждая операция
+    ставится на линию цеха, освобождающуюся раньше всех (min-heap по
+    времени освобождения). Сложность - O(N * log L) на N операций.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _load_routes(self, product_ids: List[int]) -> Dict[int, List[Tuple[int, float]]]:
+        """Маршруты продуктов: product_id -> [(workshop_id, часы на единицу)]"""
+        routes: Dict[int, List[Tuple[int, float]]] = {}
+        # Связи читаются по индексу product_id блоками, без просмотра всей таблицы
+        for chunk in chunks(product_ids):
+            rows = self.db.execute(
+                select(
+                    ProductWorkshop.product_id,
+                    ProductWorkshop.workshop_id,
+                    ProductWorkshop.production_time_hours,
+                )
+                .where(ProductWorkshop.product_id.in_(chunk))
+                .order_by(ProductWorkshop.product_id, ProductWorkshop.id)
+            )
+            for product_id, workshop_id, hours in rows:
+                routes.setdefault(product_id, []).append((workshop_id, hours or 0.0))
+        return routes
+
+    def _load_workshops(self, workshop_ids: List[int]) -> Dict[int, Tuple[str, Optional[int]]]:
+        """Цеха маршрутов: workshop_id -> (название, численность персонала)"""
+        workshops: Dict[int, Tuple[str, Optional[int]]] = {}
+        for chunk in chunks(workshop_ids):
+            rows = self.db.execute(
+                select(Workshop.id, Workshop.name, Workshop.staff_count).where(Workshop.id.in_(chunk))
+            )
+            workshops.update((workshop_id, (name, staff_count)) for workshop_id, name, staff_count in rows)
+        return workshops
+
+    def schedule(
+        self,
+        orders: Sequence[dict],
+        start_at: Optional[datetime] = None,
+        staff_per_line: int = 1,
+    ) -> dict:
+        """
+        Построить расписание выполнения заказов
+
+        Args:
+            orders: Заказы (product_id, quantity, due_date)
+            start_at: Начало планирования (по умолчанию - текущее время;
+                наивное время, как и сроки заказов, считается UTC)
+            staff_per_line: Сколько сотрудников цеха занято одним заказом
+
+        Returns:
+            dict: Сроки заказов, расписание по цехам и незапланированные заказы
+                (время - в часах от start_at)
+        """
+        start_at = _as_utc(start_at) if start_at else datetime.now(timezone.utc)
+        routes = self._load_routes(sorted({order["product_id"] for order in orders}))
+        workshops = self._load_workshops(sorted({
+            workshop_id for route in routes.values() for workshop_id, _ in route
+        }))
+
+        # Линии цеха: staff_count // staff_per_line; цех без персонала (0 или
+        # NULL) или с персоналом меньше staff_per_line выполнять операции не может
+        slots = {
+            workshop_id: (staff_count or 0) // staff_per_line
+            for workshop_id, (_, staff_count) in workshops.items()
+        }
+
+        unscheduled = []
+        due_hours: List[Optional[float]] = [None] * len(orders)
+        sequence = []
+        for index, order in enumerate(orders):
+            route = routes.get(order["product_id"])
+            if not route:
+                detail = "Product not found or has no workshops"
+            elif any(workshop_id not in workshops for workshop_id, _ in route):
+                detail = "Workshop not found"
+            elif any(slots[workshop_id] == 0 for workshop_id, _ in route):
+                detail = "Workshop has no staff for a production line"
+            else:
+                detail = None
+            if detail:
+                unscheduled.append({"index": index, "product_id": order["product_id"], "detail": detail})
+                continue
+            if order.get("due_date") is not None:
+                due_hours[index] = round(_hours_between(start_at, order["due_date"]), HOURS_PRECISION)
+            sequence.append(index)
+
+        # EDD: раньше срок - раньше в очереди; без срока - в конце, в порядке запроса
+        sequence.sort(key=lambda i: (due_hours[i] is None, due_hours[i] or 0.0, i))
+
+        # Для каждого цеха - куча (время освобождения, номер линии)
+        free_lines = {workshop_id: [(0.0, slot) for slot in range(count)] for workshop_id, count in slots.items()}
+        operations: Dict[int, List[dict]] = {workshop_id: [] for workshop_id in workshops}
+        busy_hours = dict.fromkeys(workshops, 0.0)
+
+        scheduled = []
+        for index in sequence:
+            order = orders[index]
+            product_id, quantity = order["product_id"], order["quantity"]
+            ready = 0.0
+            order_start = None
+            for workshop_id, hours in routes[product_id]:
+                lines = free_lines[workshop_id]
+                free_at, slot = lines[0]
+                start = free_at if free_at > ready else ready
+                end = start + hours * quantity
+                heapq.heapreplace(lines, (end, slot))
+                operations[workshop_id].append({
+                    "order_index": index,
+                    "product_id": product_id,
+                    "slot": slot,
+                    "start_hours": round(start, HOURS_PRECISION),
+                    "end_hours": round(end, HOURS_PRECISION),
+                })
+                busy_hours[workshop_id] += end - start
+                if order_start is None:
+                    order_start = start
+                ready = end
+
+            due = due_hours[index]
+            tardiness = max(0.0, round(ready - due, HOURS_PRECISION)) if due is not None else 0.0
+            scheduled.append({
+                "index": index,
+                "product_id": product_id,
+                "quantity": quantity,
+                "start_hours": round(order_start, HOURS_PRECISION),
+                "end_hours": round(ready, HOURS_PRECISION),
+                "due_hours": due,
+                "tardiness_hours": round(tardiness, HOURS_PRECISION),
+                "on_time": tardiness == 0.0,
+            })
+
+        makespan = max((order["end_hours"] for order in scheduled), default=0.0)
+        scheduled.sort(key=lambda order: order["index"])
+        return {
+            "start_at": start_at,
+            "makespan_hours": makespan,
+            "late_orders": sum(1 for order in scheduled if not order["on_time"]),
+            "orders": scheduled,
+            "workshops": [
+                {
+                    "workshop_id": workshop_id,
+                    "workshop_name": workshops[workshop_id][0],
+                    "staff_count": workshops[workshop_id][1],
+                    "slots": slots[workshop_id],
+                    "busy_hours": round(busy_hours[workshop_id], HOURS_PRECISION),
+                    "utilization": (
+                        busy_hours[workshop_id] / (slots[workshop_id] * makespan)
+                        if makespan > 0 and slots[workshop_id] > 0 else 0.0
+                    ),
+                    "operations": operations[workshop_id],
+                }
+                for workshop_id in sorted(workshops)
+            ],
+            "unscheduled": unscheduled,
+        }
+
+
+def schedule_orders(
+    db: Session,
+    orders: Sequence[dict],
+    start_at: Optional[datetime] = None,
+    staff_per_line: int = 1,
+) -> dict:
+    """
+    Функция-обертка для построения расписания
+
+    Args:
+        db: Сессия базы данных
+        orders: Заказы (product_id, quantity, due_date)
+        start_at: Начало планирования
+        staff_per_line: Сколько сотрудников цеха занято одним заказом
+
+    Returns:
+        dict: Расписание (см. ProductionSchedulerService.schedule)
+    """
+    scheduler = ProductionSchedulerService(db)
+    return scheduler.schedule(orders, start_at=start_at, staff_per_line=staff_per_line)
@@ -0,0 +1,100 @@
+"""
+Оптимистичная блокировка записей по столбцу version
+
+Карточка записи и ответы на создание и изменение содержат ETag с версией
+записи ("<version>-<хэш полей>", см. app.http_cache.row_etag). Клиент
+передает его в If-Match при PUT/PATCH, и изменение выполняется одним
+запросом:
+
+    UPDATE ... SET ..., version = version + 1
+    WHERE id = :id AND version IN (:expected) RETURNING ...
+
+Если запись за это время изменил кто-то другой, UPDATE не находит строку
+и API отвечает 409 с текущим ETag. Без If-Match запись изменяется
+безусловно, как раньше.
+"""
+import re
+from typing import Optional, Tuple
+
+from fastapi import Header, HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.http_cache import row_etag
+
+# entity-tag из RFC 9110: W/ для слабого тега и значение в кавычках
+_ENTITY_TAG = re.compile(r'(W/)?"([^"]*)"')
+# Значение ETag записи: версия и (необязательно) хэш полей ответа
+_ROW_TAG_VALUE = re.compile(r"(\d+)(?:-[0-9a-f]+)?")
+
+
+def if_match_version(
+    if_match: Optional[str] = Header(None, description='ETag записи ("<version>-<hash>") для защиты от потери изменений'),
+) -> Optional[Tuple[int, ...]]:
+    """
+    Dependency: версии записи, перечисленные в If-Match (None - без проверки)
+
+    If-Match сравнивается строго (RFC 9110), поэтому слабые теги (W/"...")
+    и чужие значения не совпадают ни с одной версией: изменение получает
+    409, а не 400. 400 - только для заголовка, который не разбирается
+    как список entity-tag.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tags = [tag.strip() for tag in if_match.split(",") if tag.strip()]
+    versions = []
+    for tag in tags:
+        match = _ENTITY_TAG.fullmatch(tag)
+        if match is None:
+            raise HTTPException(status_code=400, detail="Invalid If-Match header")
+        value = _ROW_TAG_VALUE.fullmatch(match.group(2))
+        if match.group(1) is None and value is not None:
+            versions.append(int(value.group(1)))
+    if not tags:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
+    return tuple(versions)
+
+
+def versioned_update(
+    db: Session, model, record_id: int, values: dict, expected_versions: Optional[Tuple[int, ...]], columns
+):
+    """
+    Изменить запись одним UPDATE ... RETURNING с увеличением версии
+
+    Args:
+        db: Сессия БД (commit выполняет вызывающий код)
+        model: Модель с полями id и version
+        record_id: ID записи
+        values: Изменяемые поля
+        expected_versions: Версии из If-Match или None (без проверки)
+        columns: Столбцы для RETURNING (должны включать version)
+
+    Returns:
+        Row или None, если запись не найдена или ее версия не совпала
+        (см. update_failure)
+    """
+    if not values:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    statement = update(model).where(model.id == record_id)
+    if expected_versions is not None:
+        statement = statement.where(model.version.in_(expected_versions))
+    statement = statement.values(**values, version=model.version + 1).returning(*columns)
+    return db.execute(statement).first()
+
+
+def update_failure(db: Session, model, record_id: int, name: str, columns) -> HTTPException:
+    """
+    404, если записи нет, иначе 409 - запись изменена другим запросом
+
+    Выполняет дополнительный запрос только в этом случае, а не перед
+    каждым изменением. name - название записи в ответе ("Product"),
+    columns - поля ответа для текущего ETag.
+    """
+    current_version = db.scalar(select(model.version).where(model.id == record_id))
+    if current_version is None:
+        return HTTPException(status_code=404, detail=f"{name} not found")
+    return HTTPException(
+        status_code=409,
+        detail=f"{name} was modified by another request",
+        headers={"ETag": row_etag(current_version, columns)},
+    )
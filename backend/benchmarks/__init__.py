@@ -0,0 +1,6 @@
+"""
+Нагрузочные тесты и бенчмарки API
+
+    python -m benchmarks.api        # все роутеры на синтетических данных 1k/100k
+    python -m benchmarks.async_db   # синхронный и асинхронный доступ к БД
+"""
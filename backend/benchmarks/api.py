@@ -0,0 +1,323 @@
+"""
+Бенчмарк всех роутеров API на синтетических данных
+
+Запуск (из каталога backend):
+    python -m benchmarks.api
+    python -m benchmarks.api --sizes 1k 100k 1m --requests 1000 --concurrency 20
+    python -m benchmarks.api --output after.json --compare before.json
+
+Для каждого размера (1k, 100k, 1m продукции, по 3 связи с цехами на
+продукт) во временном файле SQLite генерируется детерминированный набор
+данных, после чего в отдельном процессе запросы выполняются через
+httpx.AsyncClient напрямую к ASGI-приложению, без сети. По каждому
+сценарию выводятся p50/p95/p99 задержки и пропускная способность, итог -
+JSON с коммитом и окружением, который можно сравнить с результатом другого
+коммита (--compare): при росте p95 больше порога код возврата - 1.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Сценарий нагрузки: один вид запроса"""
+    name: str
+    method: str
+    path: str  # шаблон: {product_id}, {cursor}
+    body: Optional[Callable[[random.Random, dict], dict]] = None
+    requests: Optional[int] = None  # фиксированное число запросов (для тяжелых сценариев)
+    concurrency: Optional[int] = None
+    conditional: bool = False  # отправлять If-None-Match с актуальным ETag
+
+
+def _calculation(rng: random.Random, context: dict) -> dict:
+    # Небольшой набор "стандартных размеров", как у запросов панели управления
+    return {
+        "product_type_id": rng.randint(1, 20),
+        "material_type_id": rng.randint(1, 4),
+        "quantity": rng.choice([1, 10, 50, 100]),
+        "param1": rng.choice([1.0, 1.5, 2.0]),
+        "param2": rng.choice([0.5, 1.0, 2.5]),
+    }
+
+
+def _calculation_batch(rng: random.Random, context: dict) -> dict:
+    return {"items": [_calculation(rng, context) for _ in range(100)]}
+
+
+def _material_requirements(rng: random.Random, context: dict) -> dict:
+    return {"lines": [
+        {"product_id": rng.randint(1, context["products"]), "quantity": rng.randint(1, 50),
+         "param1": rng.uniform(0.5, 3.0), "param2": rng.uniform(0.5, 3.0)}
+        for _ in range(100)
+    ]}
+
+
+def _schedule(rng: random.Random, context: dict) -> dict:
+    return {"start_at": "2026-01-01T08:00:00", "orders": [
+        {"product_id": rng.randint(1, context["products"]), "quantity": rng.randint(1, 20),
+         "due_date": f"2026-01-{rng.randint(2, 28):02d}T18:00:00"}
+        for _ in range(100)
+    ]}
+
+
+def _new_product(rng: random.Random, context: dict) -> dict:
+    return {
+        "name": f"Новый продукт {rng.randint(1, 10**9)}",
+        "product_type_id": rng.randint(1, 20),
+        "article": str(rng.randint(10**8, 10**9)),
+        "min_price": round(rng.uniform(1_000, 300_000), 2),
+        "main_material": "Фанера",
+    }
+
+
+# Сценарии в порядке выполнения: сначала чтение, затем запись и выгрузка
+SCENARIOS: List[Scenario] = [
+    Scenario("products_list", "GET", "/api/products/?limit=100"),
+    Scenario("products_list_cursor", "GET", "/api/products/?limit=100&cursor={cursor}"),
+    Scenario("products_list_not_modified", "GET", "/api/products/?limit=100", conditional=True),
+    Scenario("products_expanded", "GET", "/api/products/expanded?limit=100"),
+    Scenario("product_detail", "GET", "/api/products/{product_id}"),
+    Scenario("product_types_list", "GET", "/api/product-types/"),
+    Scenario("material_types_list", "GET", "/api/material-types/"),
+    Scenario("workshops_list", "GET", "/api/workshops/"),
+    Scenario("product_workshops_list", "GET", "/api/product-workshops/?limit=100"),
+    Scenario("product_workshops_expanded", "GET", "/api/product-workshops/expanded?limit=100"),
+    Scenario("stats", "GET", "/api/stats/", requests=20, concurrency=2),
+    Scenario("calc_material", "POST", "/api/calculator/calculate-material", body=_calculation),
+    Scenario("calc_material_batch", "POST", "/api/calculator/calculate-material/batch", body=_calculation_batch),
+    Scenario("calc_material_requirements", "POST", "/api/calculator/material-requirements", body=_material_requirements),
+    Scenario("calc_workshops_for_product", "GET", "/api/calculator/workshops-for-product/{product_id}"),
+    Scenario("calc_total_production_time", "GET", "/api/calculator/total-production-time/{product_id}"),
+    Scenario("schedule", "POST", "/api/schedule", body=_schedule),
+    Scenario("product_create", "POST", "/api/products/", body=_new_product),
+    Scenario("products_export_ndjson", "GET", "/api/products/export", requests=3, concurrency=1),
+    Scenario("product_workshops_export_csv", "GET", "/api/product-workshops/export?format=csv", requests=3, concurrency=1),
+]
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Перцентиль по методу ближайшего ранга"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def _run_scenario(client, scenario: Scenario, total_requests: int, concurrency: int, context: dict) -> dict:
+    from app.pagination import encode_cursor
+
+    rng = random.Random(f"{scenario.name}:{context['seed']}")
+    headers = {}
+    if scenario.conditional:
+        response = await client.get(scenario.path)
+        headers["If-None-Match"] = response.headers.get("ETag", "")
+
+    requests = []
+    for _ in range(total_requests):
+        product_id = rng.randint(1, context["products"])
+        path = scenario.path.format(product_id=product_id, cursor=encode_cursor(product_id))
+        body = scenario.body(rng, context) if scenario.body else None
+        requests.append((path, body))
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    latencies: List[float] = []
+    errors = 0
+    response_bytes = 0
+
+    async def client_loop():
+        nonlocal errors, response_bytes
+        while True:
+            try:
+                path, body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            response = await client.request(scenario.method, path, json=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            response_bytes += len(response.content)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": scenario.method,
+        "path": scenario.path,
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "throughput_rps": round(total_requests / elapsed, 1),
+        "avg_response_bytes": response_bytes // total_requests,
+    }
+
+
+def _worker(args) -> None:
+    """Сгенерировать данные и выполнить сценарии (процесс с DATABASE_URL на временную БД)"""
+    sys.path.insert(0, str(BACKEND_DIR))
+    from sqlalchemy.engine import make_url
+    from app.config import settings
+    from benchmarks.datasets import SIZES, generate_dataset
+
+    started = time.perf_counter()
+    counts = generate_dataset(make_url(settings.DATABASE_URL).database, SIZES[args.size], seed=args.seed)
+    generate_seconds = time.perf_counter() - started
+
+    import httpx
+    from app.main import app
+
+    context = {"products": counts["products"], "seed": args.seed}
+    selected = [scenario for scenario in SCENARIOS if not args.scenarios or scenario.name in args.scenarios]
+
+    async def drive_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            results = {}
+            for scenario in selected:
+                results[scenario.name] = await _run_scenario(
+                    client,
+                    scenario,
+                    scenario.requests or args.requests,
+                    scenario.concurrency or args.concurrency,
+                    context,
+                )
+            return results
+
+    report = {
+        "dataset": counts,
+        "generate_seconds": round(generate_seconds, 2),
+        "scenarios": asyncio.run(drive_all()),
+    }
+    print(json.dumps(report, ensure_ascii=False))
+
+
+def _run_size(size: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{Path(tmp) / 'bench.sqlite'}")
+        command = [
+            sys.executable, "-m", "benchmarks.api", "--worker", "--size", size,
+            "--requests", str(args.requests), "--concurrency", str(args.concurrency), "--seed", str(args.seed),
+        ]
+        if args.scenarios:
+            command += ["--scenarios", *args.scenarios]
+        output = subprocess.run(
+            command, cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Сравнить p95 со значениями базового отчета
+
+    Returns:
+        List[str]: Сценарии, у которых p95 вырос больше чем на threshold (доля)
+    """
+    regressions = []
+    print(f"\n{'размер':<7}{'сценарий':<32}{'p95 было':>11}{'p95 стало':>11}{'изм.':>9}")
+    for size, result in report["sizes"].items():
+        base_scenarios = baseline.get("sizes", {}).get(size, {}).get("scenarios", {})
+        for name, stats in result["scenarios"].items():
+            if name not in base_scenarios:
+                continue
+            before, after = base_scenarios[name]["p95_ms"], stats["p95_ms"]
+            change = (after - before) / before if before else 0.0
+            marker = "  <-" if change > threshold else ""
+            print(f"{size:<7}{name:<32}{before:>11.2f}{after:>11.2f}{change:>+9.0%}{marker}")
+            if change > threshold:
+                regressions.append(f"{size}/{name}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], choices=["1k", "100k", "1m"])
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=10, help="Одновременных клиентов")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", nargs="+", help="Выполнить только указанные сценарии")
+    parser.add_argument("--output", help="Сохранить JSON-отчет в файл")
+    parser.add_argument("--compare", help="JSON-отчет другого коммита для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Допустимый рост p95 при сравнении (доля)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args)
+        return 0
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "db_async": os.environ.get("DB_ASYNC", "false"),
+        },
+        "sizes": {},
+    }
+    for size in args.sizes:
+        report["sizes"][size] = result = _run_size(size, args)
+        print(f"\n[{size}] продукции: {result['dataset']['products']}, "
+              f"генерация данных: {result['generate_seconds']} с")
+        print(f"{'сценарий':<32}{'p50 мс':>9}{'p95 мс':>9}{'p99 мс':>9}{'req/s':>9}{'ошибки':>8}")
+        for name, stats in result["scenarios"].items():
+            print(f"{name:<32}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+                  f"{stats['throughput_rps']:>9.1f}{stats['errors']:>8}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(report, ensure_ascii=False))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\nРост p95 больше {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
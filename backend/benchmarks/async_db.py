@@ -0,0 +1,130 @@
+"""
+Сравнение пропускной способности роутеров чтения при DB_ASYNC=false/true
+
+Запуск (из каталога backend):
+    python -m benchmarks.async_db
+    python -m benchmarks.async_db --concurrency 50 200 --requests 4000
+
+Каждый режим запускается в отдельном процессе (настройки читаются при
+импорте приложения) на временной копии production_db.sqlite. Запросы
+выполняются через httpx.AsyncClient напрямую к ASGI-приложению, без сети.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SOURCE_DB = BACKEND_DIR.parent / "production_db.sqlite"
+
+# Эндпоинты чтения, переведенные на ReadSession
+READ_PATHS = [
+    "/api/products/",
+    "/api/workshops/",
+    "/api/product-workshops/?limit=50",
+    "/api/product-workshops/expanded?limit=50",
+    "/api/calculator/workshops-for-product/{product_id}",
+    "/api/calculator/total-production-time/{product_id}",
+]
+
+
+async def _drive(concurrency: int, total_requests: int) -> dict:
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        products = (await client.get("/api/products/", params={"limit": 1000})).json()
+        product_ids = [product["id"] for product in products] or [1]
+        paths = [
+            READ_PATHS[i % len(READ_PATHS)].format(product_id=product_ids[i % len(product_ids)])
+            for i in range(total_requests)
+        ]
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for path in paths:
+            queue.put_nowait(path)
+        errors = 0
+
+        async def client_loop():
+            nonlocal errors
+            while True:
+                try:
+                    path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total_requests / elapsed, 1),
+    }
+
+
+def _worker(concurrency: list, total_requests: int) -> None:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    async def drive_all():
+        # Один event loop на все уровни: пул асинхронного движка привязан к нему
+        return [await _drive(level, total_requests) for level in concurrency]
+
+    print(json.dumps(asyncio.run(drive_all())))
+
+
+def _run_mode(async_mode: bool, concurrency: list, total_requests: int) -> list:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        shutil.copyfile(SOURCE_DB, db_path)
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{db_path}",
+            DB_ASYNC="true" if async_mode else "false",
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.async_db", "--worker",
+             "--requests", str(total_requests), "--concurrency", *map(str, concurrency)],
+            cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--requests", type=int, default=4000, help="Запросов на каждый уровень конкурентности")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.concurrency, args.requests)
+        return
+
+    report = {
+        "sync": _run_mode(False, args.concurrency, args.requests),
+        "async": _run_mode(True, args.concurrency, args.requests),
+    }
+    print(f"{'режим':<8}{'клиенты':>10}{'запросов':>10}{'ошибки':>8}{'сек':>9}{'req/s':>10}")
+    for mode, rows in report.items():
+        for row in rows:
+            print(f"{mode:<8}{row['concurrency']:>10}{row['requests']:>10}{row['errors']:>8}"
+                  f"{row['seconds']:>9}{row['requests_per_second']:>10}")
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Синтетические наборы данных для бенчмарков
+
+Данные генерируются детерминированно (фиксированный seed), поэтому
+один и тот же размер дает одинаковую БД на любом коммите и результаты
+бенчмарков можно сравнивать между собой.
+"""
+import random
+import sqlite3
+from pathlib import Path
+from typing import Dict, Union
+
+from sqlalchemy import create_engine
+
+from app.database import Base
+from app.migrations import apply_migrations
+from app.models import material_type, product, product_type, product_workshop, workshop  # noqa: F401
+
+# Размеры наборов: количество продукции
+SIZES: Dict[str, int] = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+MATERIALS = [
+    ("Мебельный щит из массива дерева", 0.8),
+    ("Ламинированное ДСП", 0.7),
+    ("Фанера", 0.55),
+    ("МДФ", 0.3),
+]
+PRODUCT_TYPE_COUNT = 20
+WORKSHOP_COUNT = 20
+LINKS_PER_PRODUCT = 3
+INSERT_CHUNK_SIZE = 50_000
+
+
+def _insert_chunked(connection, sql: str, rows) -> None:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK_SIZE:
+            connection.executemany(sql, chunk)
+            chunk = []
+    if chunk:
+        connection.executemany(sql, chunk)
+
+
+def generate_dataset(path: Union[str, Path], products: int, seed: int = 42) -> dict:
+    """
+    Создать БД SQLite с синтетическими данными
+
+    Схема создается по моделям, миграции (триггеры версий таблиц)
+    применяются после загрузки, чтобы не замедлять вставку.
+
+    Args:
+        path: Путь к новому файлу БД
+        products: Количество продукции
+        seed: Начальное значение генератора случайных чисел
+
+    Returns:
+        dict: Количество записей по таблицам
+    """
+    path = Path(path)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    connection = sqlite3.connect(path)
+    try:
+        connection.executemany(
+            "INSERT INTO material_type (name, loss_percentage) VALUES (?, ?)", MATERIALS
+        )
+        connection.executemany(
+            "INSERT INTO product_type (name, coefficient) VALUES (?, ?)",
+            [(f"Тип продукции {i}", round(rng.uniform(1.5, 9.0), 2)) for i in range(1, PRODUCT_TYPE_COUNT + 1)],
+        )
+        connection.executemany(
+            "INSERT INTO workshops (name, workshop_type, staff_count) VALUES (?, ?, ?)",
+            [(f"Цех {i}", rng.choice(["Проектирование", "Обработка", "Сборка"]), rng.randint(2, 12))
+             for i in range(1, WORKSHOP_COUNT + 1)],
+        )
+        _insert_chunked(
+            connection,
+            "INSERT INTO products (name, product_type_id, article, min_price, main_material) VALUES (?, ?, ?, ?, ?)",
+            (
+                (f"Продукт {i}", rng.randint(1, PRODUCT_TYPE_COUNT), str(1_000_000 + i),
+                 round(rng.uniform(1_000, 300_000), 2), rng.choice(MATERIALS)[0])
+                for i in range(1, products + 1)
+            ),
+        )
+        workshop_ids = list(range(1, WORKSHOP_COUNT + 1))
+        _insert_chunked(
+            connection,
+            "INSERT INTO product_workshops (product_id, workshop_id, production_time_hours) VALUES (?, ?, ?)",
+            (
+                (product_id, workshop_id, round(rng.uniform(0.3, 5.0), 1))
+                for product_id in range(1, products + 1)
+                for workshop_id in rng.sample(workshop_ids, LINKS_PER_PRODUCT)
+            ),
+        )
+        connection.commit()
+        apply_migrations(connection)
+    finally:
+        connection.close()
+
+    return {
+        "material_types": len(MATERIALS),
+        "product_types": PRODUCT_TYPE_COUNT,
+        "workshops": WORKSHOP_COUNT,
+        "products": products,
+        "product_workshops": products * LINKS_PER_PRODUCT,
+    }
@@ -0,0 +1,45 @@
+"""
+Общие фикстуры: приложение на временной БД
+
+DATABASE_URL задается до импорта app, поэтому тесты не трогают
+production_db.sqlite.
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+_TEST_DIR = tempfile.mkdtemp(prefix="production-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_TEST_DIR) / 'test.sqlite'}"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.database import Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.migrations import VERSIONED_TABLES  # noqa: E402
+from app.services.reference_cache import reference_cache  # noqa: E402
+from app.services.result_cache import calculation_cache  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """TestClient со схемой моделей и миграциями (lifespan приложения)"""
+    Base.metadata.create_all(engine)
+    with TestClient(app) as client:
+        yield client
+    engine.dispose()
+    shutil.rmtree(_TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def client(app_client):
+    """TestClient на пустой БД: данные теста удаляются после него"""
+    yield app_client
+    with engine.begin() as connection:
+        # Сначала связи, затем таблицы, на которые они ссылаются
+        for table in reversed(VERSIONED_TABLES):
+            connection.execute(text(f"DELETE FROM {table}"))
+    reference_cache.invalidate_all()
+    calculation_cache.clear()
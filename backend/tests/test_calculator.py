@@ -0,0 +1,51 @@
+"""
+Пакетный расчет сырья: ошибки возвращаются по каждой позиции
+"""
+import pytest
+
+
+@pytest.fixture
+def types(client):
+    product_type = client.post("/api/product-types", json={"name": "Столы", "coefficient": 2.0}).json()
+    material_type = client.post("/api/material-types", json={"name": "Дерево", "loss_percentage": 10.0}).json()
+    no_coefficient = client.post("/api/product-types", json={"name": "Прочее"}).json()
+    return product_type["id"], material_type["id"], no_coefficient["id"]
+
+
+def test_batch_reports_errors_per_line(client, types):
+    product_type_id, material_type_id, no_coefficient_id = types
+    valid = {"product_type_id": product_type_id, "material_type_id": material_type_id,
+             "quantity": 10, "param1": 1.5, "param2": 2.0}
+    items = [
+        valid,
+        {**valid, "quantity": 0},
+        {**valid, "param2": -1.0},
+        {**valid, "product_type_id": 999999},
+        {**valid, "material_type_id": 999999},
+        {**valid, "product_type_id": no_coefficient_id},
+    ]
+
+    response = client.post("/api/calculator/calculate-material/batch", json={"items": items})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["required_material"] for result in body["results"]] == [66, -1, -1, -1, -1, -1]
+    assert [result["message"] for result in body["results"][1:]] == [
+        "Ошибка расчета: Количество продукции должно быть больше нуля",
+        "Ошибка расчета: Параметры продукции должны быть больше нуля",
+        "Ошибка расчета: Тип продукции не найден",
+        "Ошибка расчета: Тип материала не найден",
+        "Ошибка расчета: Для типа продукции не задан коэффициент",
+    ]
+    assert (body["total"], body["succeeded"], body["failed"]) == (6, 1, 5)
+
+
+def test_batch_matches_single_calculation(client, types):
+    product_type_id, material_type_id, _ = types
+    item = {"product_type_id": product_type_id, "material_type_id": material_type_id,
+            "quantity": 7, "param1": 1.3, "param2": 0.7}
+
+    single = client.post("/api/calculator/calculate-material", json=item).json()
+    batch = client.post("/api/calculator/calculate-material/batch", json={"items": [item]}).json()
+
+    assert batch["results"][0]["required_material"] == single["required_material"]
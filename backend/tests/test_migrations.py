@@ -0,0 +1,44 @@
+"""
+Миграции схемы и планы ключевых запросов (app.migrations)
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.database import Base
+from app.migrations import apply_migrations, check_query_plans
+from app.models import material_type, product, product_type, product_workshop, workshop  # noqa: F401
+
+
+@pytest.fixture
+def connection(tmp_path):
+    """Новая БД со схемой моделей и всеми миграциями"""
+    path = tmp_path / "migrations.sqlite"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    connection = sqlite3.connect(path)
+    apply_migrations(connection)
+    yield connection
+    connection.close()
+
+
+def test_key_queries_use_indexes(connection):
+    scans = [
+        f"{description}: {'; '.join(plan)}"
+        for description, plan, uses_index in check_query_plans(connection)
+        if not uses_index
+    ]
+    assert scans == []
+
+
+def test_migrations_are_idempotent(connection):
+    assert apply_migrations(connection)
+    assert all(uses_index for _, _, uses_index in check_query_plans(connection))
+
+
+def test_check_reports_missing_index(connection):
+    connection.execute("DROP INDEX ix_products_article")
+    results = {description: uses_index for description, _, uses_index in check_query_plans(connection)}
+    assert results["Продукция по артикулу"] is False
@@ -0,0 +1,82 @@
+"""
+Версии записей: ETag карточек и If-Match при изменении (app.versioning)
+"""
+import pytest
+from sqlalchemy import text
+
+from app.database import engine
+
+
+@pytest.fixture
+def workshop(client):
+    response = client.post("/api/workshops", json={"name": "Сборочный", "staff_count": 5})
+    assert response.status_code == 201
+    return response.json()
+
+
+def _patch(client, workshop, if_match):
+    return client.patch(f"/api/workshops/{workshop['id']}", json={"staff_count": 6}, headers={"If-Match": if_match})
+
+
+def test_etag_depends_on_fields(client, workshop):
+    full = client.get(f"/api/workshops/{workshop['id']}")
+
+    response = client.get(
+        f"/api/workshops/{workshop['id']}?fields=id,name",
+        headers={"If-None-Match": full.headers["ETag"]},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != full.headers["ETag"]
+    assert response.json() == {"id": workshop["id"], "name": "Сборочный", "version": 1}
+
+
+def test_update_with_current_etag(client, workshop):
+    etag = client.get(f"/api/workshops/{workshop['id']}").headers["ETag"]
+
+    response = _patch(client, workshop, etag)
+
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"].startswith('"2-')
+
+
+@pytest.mark.parametrize("if_match", ['"7", "1"', '"1"', '"1-0123abcd"'])
+def test_if_match_accepts_any_listed_version(client, workshop, if_match):
+    assert _patch(client, workshop, if_match).status_code == 200
+
+
+@pytest.mark.parametrize("if_match", ['W/"1"', '"2"', '"7", W/"1"'])
+def test_if_match_conflict(client, workshop, if_match):
+    response = _patch(client, workshop, if_match)
+
+    assert response.status_code == 409
+    assert response.headers["ETag"].startswith('"1-')
+
+
+@pytest.mark.parametrize("if_match", ["1", '"1', " , "])
+def test_if_match_malformed(client, workshop, if_match):
+    response = _patch(client, workshop, if_match)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid If-Match header"}
+
+
+def test_reference_detail_follows_table_changes(client):
+    created = client.post("/api/material-types", json={"name": "Дерево", "loss_percentage": 1.5}).json()
+    path = f"/api/material-types/{created['id']}"
+    etag = client.get(path).headers["ETag"]
+
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    # Изменение в обход API: карточка из кэша справочников перечитывается
+    with engine.begin() as connection:
+        connection.execute(
+            text("UPDATE material_type SET loss_percentage = 2.5, version = version + 1 WHERE id = :id"),
+            {"id": created["id"]},
+        )
+    response = client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json() == {"id": created["id"], "name": "Дерево", "loss_percentage": 2.5, "version": 2}
+    assert client.get("/api/material-types/999999").status_code == 404
@@ -0,0 +1,181 @@
+"""
+Ответы на ошибки записи (app.integrity): те же 400/404, что давали
+проверки перед записью, теперь по ограничениям UNIQUE и внешним ключам
+"""
+import pytest
+
+MISSING_ID = 999999
+
+# (путь, тело для создания, тело для второй записи, ответ при повторе названия)
+NAMED_RESOURCES = [
+    (
+        "/api/material-types",
+        {"name": "Дерево", "loss_percentage": 1.5},
+        {"name": "Пластик", "loss_percentage": 0.5},
+        "Material type with this name already exists",
+    ),
+    (
+        "/api/product-types",
+        {"name": "Столы", "coefficient": 1.2},
+        {"name": "Стулья", "coefficient": 1.1},
+        "Product type with this name already exists",
+    ),
+    (
+        "/api/workshops",
+        {"name": "Сборочный", "workshop_type": "Сборка", "staff_count": 5},
+        {"name": "Покрасочный", "workshop_type": "Покраска", "staff_count": 3},
+        "Workshop with this name already exists",
+    ),
+]
+
+
+def _create(client, path, payload):
+    response = client.post(path, json=payload)
+    assert response.status_code == 201, response.json()
+    return response.json()
+
+
+@pytest.fixture
+def product_type(client):
+    return _create(client, "/api/product-types", {"name": "Шкафы", "coefficient": 1.5})
+
+
+@pytest.fixture
+def product(client, product_type):
+    return _create(client, "/api/products", {
+        "name": "Шкаф-купе",
+        "product_type_id": product_type["id"],
+        "article": "SH-001",
+        "min_price": 15000.0,
+        "main_material": "ЛДСП",
+    })
+
+
+@pytest.fixture
+def workshop(client):
+    return _create(client, "/api/workshops", {"name": "Раскройный", "workshop_type": "Раскрой", "staff_count": 4})
+
+
+@pytest.mark.parametrize("path, payload, _other, detail", NAMED_RESOURCES)
+def test_create_duplicate_name(client, path, payload, _other, detail):
+    _create(client, path, payload)
+
+    response = client.post(path, json=payload)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+
+
+@pytest.mark.parametrize("path, payload, other, detail", NAMED_RESOURCES)
+def test_update_duplicate_name(client, path, payload, other, detail):
+    _create(client, path, payload)
+    second = _create(client, path, other)
+
+    response = client.put(f"{path}/{second['id']}", json={**other, "name": payload["name"]})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+
+
+@pytest.mark.parametrize("path, payload, detail", [
+    ("/api/material-types", {"name": "Металл"}, "Material type not found"),
+    ("/api/product-types", {"name": "Кровати"}, "Product type not found"),
+    ("/api/workshops", {"name": "Упаковочный"}, "Workshop not found"),
+])
+def test_update_missing_named_record(client, path, payload, detail):
+    response = client.put(f"{path}/{MISSING_ID}", json=payload)
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": detail}
+
+
+def test_create_product_with_missing_type(client):
+    response = client.post("/api/products", json={"name": "Стол", "product_type_id": MISSING_ID})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Product type not found"}
+
+
+def test_update_product_with_missing_type(client, product):
+    response = client.put(f"/api/products/{product['id']}", json={"name": "Стол", "product_type_id": MISSING_ID})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Product type not found"}
+
+
+def test_update_missing_product(client, product_type):
+    response = client.put(f"/api/products/{MISSING_ID}", json={"name": "Стол", "product_type_id": product_type["id"]})
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Product not found"}
+
+
+@pytest.mark.parametrize("missing, detail", [
+    ("product", "Product not found"),
+    ("workshop", "Workshop not found"),
+    # Если нет обеих записей, ответ - по продукции, как при проверке перед записью
+    ("both", "Product not found"),
+])
+def test_create_link_with_missing_reference(client, product, workshop, missing, detail):
+    payload = {
+        "product_id": MISSING_ID if missing in ("product", "both") else product["id"],
+        "workshop_id": MISSING_ID if missing in ("workshop", "both") else workshop["id"],
+        "production_time_hours": 2.0,
+    }
+
+    response = client.post("/api/product-workshops", json=payload)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+
+
+@pytest.mark.parametrize("missing, detail", [
+    ("product", "Product not found"),
+    ("workshop", "Workshop not found"),
+    ("both", "Product not found"),
+])
+def test_update_link_with_missing_reference(client, product, workshop, missing, detail):
+    link = _create(client, "/api/product-workshops", {"product_id": product["id"], "workshop_id": workshop["id"]})
+    payload = {
+        "product_id": MISSING_ID if missing in ("product", "both") else product["id"],
+        "workshop_id": MISSING_ID if missing in ("workshop", "both") else workshop["id"],
+    }
+
+    response = client.put(f"/api/product-workshops/{link['id']}", json=payload)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+
+
+def test_create_duplicate_link(client, product, workshop):
+    payload = {"product_id": product["id"], "workshop_id": workshop["id"], "production_time_hours": 1.0}
+    _create(client, "/api/product-workshops", payload)
+
+    response = client.post("/api/product-workshops", json=payload)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Product workshop relationship already exists"}
+
+
+def test_update_link_to_existing_pair(client, product, workshop):
+    _create(client, "/api/product-workshops", {"product_id": product["id"], "workshop_id": workshop["id"]})
+    other_workshop = _create(client, "/api/workshops", {"name": "Отделочный"})
+    link = _create(client, "/api/product-workshops", {"product_id": product["id"], "workshop_id": other_workshop["id"]})
+
+    response = client.put(
+        f"/api/product-workshops/{link['id']}",
+        json={"product_id": product["id"], "workshop_id": workshop["id"]},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Product workshop relationship already exists"}
+
+
+def test_update_missing_link(client, product, workshop):
+    response = client.put(
+        f"/api/product-workshops/{MISSING_ID}",
+        json={"product_id": product["id"], "workshop_id": workshop["id"]},
+    )
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Product workshop relationship not found"}
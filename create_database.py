@@ -2,10 +2,13 @@
 Скрипт для создания базы данных и импорта данных из Excel файлов
 """
 import sqlite3
-import pandas as pd
-import os
+import sys
 from pathlib import Path
 
+# Модуль импорта находится в backend/app/services/data_import.py
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'backend'))
+from app.services.data_import import import_directory, print_report
+
 # Создаем базу данных
 DB_NAME = 'production_db.sqlite'
 conn = sqlite3.connect(DB_NAME)
@@ -71,124 +74,22 @@ CREATE TABLE IF NOT EXISTS product_workshops (
 )
 ''')
 
+# 6. Индексы на внешние ключи и артикул
+cursor.execute('CREATE INDEX IF NOT EXISTS ix_products_product_type_id ON products (product_type_id)')
+cursor.execute('CREATE INDEX IF NOT EXISTS ix_products_article ON products (article)')
+cursor.execute('CREATE INDEX IF NOT EXISTS ix_product_workshops_product_id ON product_workshops (product_id)')
+cursor.execute('CREATE INDEX IF NOT EXISTS ix_product_workshops_workshop_id ON product_workshops (workshop_id)')
+
 print("Таблицы созданы успешно!")
 
 # Импортируем данные из Excel
 print("\nИмпорт данных из Excel файлов...")
 
 try:
-    # Импорт Material_type
-    if os.path.exists(excel_dir / 'Material_type_import.xlsx'):
-        df = pd.read_excel(excel_dir / 'Material_type_import.xlsx')
-        print(f"\nMaterial_type: {len(df)} записей")
-        print(f"Колонки: {list(df.columns)}")
-        for _, row in df.iterrows():
-            try:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO material_type (name, loss_percentage)
-                    VALUES (?, ?)
-                ''', (str(row['Тип материала']) if pd.notna(row['Тип материала']) else None,
-                      float(row['Процент потерь сырья']) if pd.notna(row['Процент потерь сырья']) else None))
-            except Exception as e:
-                print(f"Ошибка при импорте Material_type: {e}")
-    
-    # Импорт Product_type
-    if os.path.exists(excel_dir / 'Product_type_import.xlsx'):
-        df = pd.read_excel(excel_dir / 'Product_type_import.xlsx')
-        print(f"\nProduct_type: {len(df)} записей")
-        print(f"Колонки: {list(df.columns)}")
-        for _, row in df.iterrows():
-            try:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO product_type (name, coefficient)
-                    VALUES (?, ?)
-                ''', (str(row['Тип продукции']) if pd.notna(row['Тип продукции']) else None,
-                      float(row['Коэффициент типа продукции']) if pd.notna(row['Коэффициент типа продукции']) else None))
-            except Exception as e:
-                print(f"Ошибка при импорте Product_type: {e}")
-    
-    # Импорт Workshops
-    if os.path.exists(excel_dir / 'Workshops_import.xlsx'):
-        df = pd.read_excel(excel_dir / 'Workshops_import.xlsx')
-        print(f"\nWorkshops: {len(df)} записей")
-        print(f"Колонки: {list(df.columns)}")
-        for _, row in df.iterrows():
-            try:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO workshops (name, workshop_type, staff_count)
-                    VALUES (?, ?, ?)
-                ''', (str(row['Название цеха']) if pd.notna(row['Название цеха']) else None,
-                      str(row['Тип цеха']) if pd.notna(row['Тип цеха']) else None,
-                      int(row['Количество человек для производства ']) if pd.notna(row['Количество человек для производства ']) else None))
-            except Exception as e:
-                print(f"Ошибка при импорте Workshops: {e}")
-    
-    # Импорт Products
-    if os.path.exists(excel_dir / 'Products_import.xlsx'):
-        df = pd.read_excel(excel_dir / 'Products_import.xlsx')
-        print(f"\nProducts: {len(df)} записей")
-        print(f"Колонки: {list(df.columns)}")
-        for _, row in df.iterrows():
-            try:
-                # Находим product_type_id по имени
-                product_type_name = str(row['Тип продукции']) if pd.notna(row['Тип продукции']) else None
-                product_type_id = None
-                if product_type_name:
-                    cursor.execute('SELECT id FROM product_type WHERE name = ?', (product_type_name,))
-                    result = cursor.fetchone()
-                    product_type_id = result[0] if result else None
-                
-                cursor.execute('''
-                    INSERT OR IGNORE INTO products (name, product_type_id, article, min_price, main_material)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (str(row['Наименование продукции']) if pd.notna(row['Наименование продукции']) else None,
-                      product_type_id,
-                      str(row['Артикул']) if pd.notna(row['Артикул']) else None,
-                      float(row['Минимальная стоимость для партнера']) if pd.notna(row['Минимальная стоимость для партнера']) else None,
-                      str(row['Основной материал']) if pd.notna(row['Основной материал']) else None))
-            except Exception as e:
-                print(f"Ошибка при импорте Products: {e}")
-    
-    # Импорт Product_workshops
-    if os.path.exists(excel_dir / 'Product_workshops_import.xlsx'):
-        df = pd.read_excel(excel_dir / 'Product_workshops_import.xlsx')
-        print(f"\nProduct_workshops: {len(df)} записей")
-        print(f"Колонки: {list(df.columns)}")
-        imported_count = 0
-        for _, row in df.iterrows():
-            try:
-                # Находим product_id и workshop_id по именам
-                product_name = str(row['Наименование продукции']) if pd.notna(row['Наименование продукции']) else None
-                workshop_name = str(row['Название цеха']) if pd.notna(row['Название цеха']) else None
-                
-                product_id = None
-                workshop_id = None
-                
-                if product_name:
-                    cursor.execute('SELECT id FROM products WHERE name = ?', (product_name,))
-                    result = cursor.fetchone()
-                    product_id = result[0] if result else None
-                
-                if workshop_name:
-                    cursor.execute('SELECT id FROM workshops WHERE name = ?', (workshop_name,))
-                    result = cursor.fetchone()
-                    workshop_id = result[0] if result else None
-                
-                if product_id and workshop_id:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO product_workshops (product_id, workshop_id, production_time_hours)
-                        VALUES (?, ?, ?)
-                    ''', (product_id, workshop_id,
-                          float(row['Время изготовления, ч']) if pd.notna(row['Время изготовления, ч']) else None))
-                    imported_count += 1
-                else:
-                    if not product_id:
-                        print(f"  Предупреждение: продукт '{product_name}' не найден")
-                    if not workshop_id:
-                        print(f"  Предупреждение: цех '{workshop_name}' не найден")
-            except Exception as e:
-                print(f"Ошибка при импорте Product_workshops: {e}")
-        print(f"  Импортировано записей: {imported_count}")
+    # Пакетный импорт: сопоставление имен через словари и executemany на таблицу
+    for report in import_directory(conn, excel_dir):
+        print()
+        print_report(report)
     
     conn.commit()
     print("\nДанные успешно импортированы!")
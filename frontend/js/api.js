@@ -5,28 +5,80 @@ const API_BASE_URL = 'http://localhost:8000/api';
 class API {
     constructor(baseUrl) {
         this.baseUrl = baseUrl;
+        // Кэш GET-ответов: url -> { etag, data, headers, freshUntil }
+        this.cache = new Map();
+    }
+
+    // Сколько миллисекунд ответ можно использовать без запроса (Cache-Control: max-age)
+    freshnessLifetime(headers) {
+        const cacheControl = headers.get('Cache-Control') || '';
+        const match = cacheControl.match(/max-age=(\d+)/);
+        if (!match || cacheControl.includes('no-cache')) {
+            return 0;
+        }
+        return Number(match[1]) * 1000;
     }
 
     // Общий метод для выполнения запросов
     async request(endpoint, options = {}) {
+        const { data } = await this.send(endpoint, options);
+        return data;
+    }
+
+    // Выполнение запроса с возвратом тела и заголовков ответа
+    async send(endpoint, options = {}) {
         const url = `${this.baseUrl}${endpoint}`;
+        const isGet = !options.method || options.method === 'GET';
+        const cached = isGet ? this.cache.get(url) : undefined;
+
+        // Свежий ответ (справочники с max-age) используем без запроса
+        if (cached && cached.freshUntil > Date.now()) {
+            return { data: cached.data, headers: cached.headers };
+        }
+
         const config = {
+            ...options,
             headers: {
                 'Content-Type': 'application/json',
                 ...options.headers
-            },
-            ...options
+            }
         };
+        if (isGet) {
+            // Перепроверку по ETag выполняем сами, HTTP-кэш браузера не нужен
+            config.cache = 'no-store';
+            if (cached) {
+                config.headers['If-None-Match'] = cached.etag;
+            }
+        }
 
         try {
             const response = await fetch(url, config);
+
+            if (response.status === 304 && cached) {
+                cached.freshUntil = Date.now() + this.freshnessLifetime(response.headers);
+                return { data: cached.data, headers: cached.headers };
+            }
             
             if (!response.ok) {
                 const errorData = await response.json().catch(() => ({}));
                 throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
             }
 
-            return await response.json();
+            const data = await response.json();
+            const etag = response.headers.get('ETag');
+            if (isGet && etag) {
+                this.cache.set(url, {
+                    etag,
+                    data,
+                    headers: response.headers,
+                    freshUntil: Date.now() + this.freshnessLifetime(response.headers)
+                });
+            } else if (!isGet) {
+                // После изменения данных все ответы перепроверяются по ETag
+                this.cache.forEach(entry => { entry.freshUntil = 0; });
+            }
+
+            return { data, headers: response.headers };
         } catch (error) {
             console.error('API request failed:', error);
             throw error;
@@ -38,6 +90,23 @@ class API {
         return this.request(endpoint, { method: 'GET' });
     }
 
+    // GET всех страниц списка (по курсору из заголовка X-Next-Cursor)
+    async getAllPages(endpoint, pageSize = 500) {
+        const items = [];
+        let cursor = null;
+        do {
+            const separator = endpoint.includes('?') ? '&' : '?';
+            const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+            const { data, headers } = await this.send(
+                `${endpoint}${separator}limit=${pageSize}${cursorParam}`,
+                { method: 'GET' }
+            );
+            items.push(...data);
+            cursor = headers.get('X-Next-Cursor');
+        } while (cursor);
+        return items;
+    }
+
     // POST запрос
     async post(endpoint, data) {
         return this.request(endpoint, {
@@ -46,14 +115,29 @@ class API {
         });
     }
 
-    // PUT запрос
-    async put(endpoint, data) {
+    // PUT запрос (version - версия записи для If-Match, см. versionHeaders)
+    async put(endpoint, data, version = null) {
         return this.request(endpoint, {
             method: 'PUT',
+            headers: this.versionHeaders(version),
             body: JSON.stringify(data)
         });
     }
 
+    // PATCH запрос: передаются только изменяемые поля
+    async patch(endpoint, data, version = null) {
+        return this.request(endpoint, {
+            method: 'PATCH',
+            headers: this.versionHeaders(version),
+            body: JSON.stringify(data)
+        });
+    }
+
+    // If-Match с версией записи: если запись успели изменить, API ответит 409
+    versionHeaders(version) {
+        return version != null ? { 'If-Match': `"${version}"` } : {};
+    }
+
     // DELETE запрос
     async delete(endpoint) {
         return this.request(endpoint, { method: 'DELETE' });
@@ -65,52 +149,61 @@ const api = new API(API_BASE_URL);
 
 // Методы для работы с типами материалов
 const materialTypesAPI = {
-    getAll: () => api.get('/material-types'),
+    getAll: () => api.getAllPages('/material-types'),
     getById: (id) => api.get(`/material-types/${id}`),
     create: (data) => api.post('/material-types', data),
-    update: (id, data) => api.put(`/material-types/${id}`, data),
+    update: (id, data, version) => api.put(`/material-types/${id}`, data, version),
     delete: (id) => api.delete(`/material-types/${id}`)
 };
 
 // Методы для работы с типами продукции
 const productTypesAPI = {
-    getAll: () => api.get('/product-types'),
+    getAll: () => api.getAllPages('/product-types'),
     getById: (id) => api.get(`/product-types/${id}`),
     create: (data) => api.post('/product-types', data),
-    update: (id, data) => api.put(`/product-types/${id}`, data),
+    update: (id, data, version) => api.put(`/product-types/${id}`, data, version),
     delete: (id) => api.delete(`/product-types/${id}`)
 };
 
 // Методы для работы с цехами
 const workshopsAPI = {
-    getAll: () => api.get('/workshops'),
+    getAll: () => api.getAllPages('/workshops'),
     getById: (id) => api.get(`/workshops/${id}`),
     create: (data) => api.post('/workshops', data),
-    update: (id, data) => api.put(`/workshops/${id}`, data),
+    update: (id, data, version) => api.put(`/workshops/${id}`, data, version),
     delete: (id) => api.delete(`/workshops/${id}`)
 };
 
 // Методы для работы с продукцией
 const productsAPI = {
-    getAll: () => api.get('/products'),
+    // fields - только нужные поля, например 'id,name' для выпадающих списков
+    getAll: (fields) => api.getAllPages(fields ? `/products?fields=${fields}` : '/products'),
+    getExpanded: () => api.getAllPages('/products/expanded'),
     getById: (id) => api.get(`/products/${id}`),
     create: (data) => api.post('/products', data),
-    update: (id, data) => api.put(`/products/${id}`, data),
+    update: (id, data, version) => api.put(`/products/${id}`, data, version),
     delete: (id) => api.delete(`/products/${id}`)
 };
 
 // Методы для работы со связями продукции и цехов
 const productWorkshopsAPI = {
-    getAll: () => api.get('/product-workshops'),
+    getAll: () => api.getAllPages('/product-workshops'),
+    getExpanded: () => api.getAllPages('/product-workshops/expanded'),
     getById: (id) => api.get(`/product-workshops/${id}`),
     create: (data) => api.post('/product-workshops', data),
-    update: (id, data) => api.put(`/product-workshops/${id}`, data),
+    update: (id, data, version) => api.put(`/product-workshops/${id}`, data, version),
     delete: (id) => api.delete(`/product-workshops/${id}`)
 };
 
+// Методы для получения статистики
+const statsAPI = {
+    get: () => api.get('/stats')
+};
+
 // Методы для работы с калькулятором сырья
 const calculatorAPI = {
     calculateMaterial: (data) => api.post('/calculator/calculate-material', data),
+    calculateMaterialBatch: (items) => api.post('/calculator/calculate-material/batch', { items }),
     getWorkshopsForProduct: (productId) => api.get(`/calculator/workshops-for-product/${productId}`),
     getTotalProductionTime: (productId) => api.get(`/calculator/total-production-time/${productId}`)
 };
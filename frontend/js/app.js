@@ -89,17 +89,13 @@ async function loadSectionData(sectionName) {
 // Загрузка панели управления
 async function loadDashboard() {
     try {
-        const [materialTypes, productTypes, workshops, products] = await Promise.all([
-            materialTypesAPI.getAll(),
-            productTypesAPI.getAll(),
-            workshopsAPI.getAll(),
-            productsAPI.getAll()
-        ]);
+        // Количество записей считается на сервере агрегатными запросами
+        const stats = await statsAPI.get();
 
-        document.getElementById('material-types-count').textContent = materialTypes.length;
-        document.getElementById('product-types-count').textContent = productTypes.length;
-        document.getElementById('workshops-count').textContent = workshops.length;
-        document.getElementById('products-count').textContent = products.length;
+        document.getElementById('material-types-count').textContent = stats.counts.material_types;
+        document.getElementById('product-types-count').textContent = stats.counts.product_types;
+        document.getElementById('workshops-count').textContent = stats.counts.workshops;
+        document.getElementById('products-count').textContent = stats.counts.products;
     } catch (error) {
         apiUtils.handleError(error, 'при загрузке статистики');
     }
@@ -235,13 +231,9 @@ async function loadWorkshops() {
 // Загрузка продукции
 async function loadProducts() {
     try {
-        const [products, productTypes] = await Promise.all([
-            productsAPI.getAll(),
-            productTypesAPI.getAll()
-        ]);
-        
+        // Название типа продукции приходит с сервера (JOIN на стороне API)
+        const products = await productsAPI.getExpanded();
         productsCache = products;
-        productTypesCache = productTypes;
         
         const tbody = document.querySelector('#products-table tbody');
         
@@ -251,12 +243,11 @@ async function loadProducts() {
         }
         
         tbody.innerHTML = products.map(item => {
-            const productType = productTypes.find(pt => pt.id === item.product_type_id);
             return `
                 <tr>
                     <td>${item.id}</td>
                     <td>${item.name}</td>
-                    <td>${productType ? productType.name : '-'}</td>
+                    <td>${item.product_type_name || '-'}</td>
                     <td>${item.article || '-'}</td>
                     <td>${item.min_price !== null ? item.min_price.toLocaleString() + ' ₽' : '-'}</td>
                     <td>${item.main_material || '-'}</td>
@@ -281,11 +272,8 @@ async function loadProducts() {
 // Загрузка связей продукции и цехов
 async function loadProductWorkshops() {
     try {
-        const [productWorkshops, products, workshops] = await Promise.all([
-            productWorkshopsAPI.getAll(),
-            productsAPI.getAll(),
-            workshopsAPI.getAll()
-        ]);
+        // Названия продукции и цехов приходят с сервера (JOIN на стороне API)
+        const productWorkshops = await productWorkshopsAPI.getExpanded();
         
         const tbody = document.querySelector('#product-workshops-table tbody');
         
@@ -295,13 +283,11 @@ async function loadProductWorkshops() {
         }
         
         tbody.innerHTML = productWorkshops.map(item => {
-            const product = products.find(p => p.id === item.product_id);
-            const workshop = workshops.find(w => w.id === item.workshop_id);
             return `
                 <tr>
                     <td>${item.id}</td>
-                    <td>${product ? product.name : 'Неизвестно'}</td>
-                    <td>${workshop ? workshop.name : 'Неизвестно'}</td>
+                    <td>${item.product_name || 'Неизвестно'}</td>
+                    <td>${item.workshop_name || 'Неизвестно'}</td>
                     <td>${item.production_time_hours !== null ? item.production_time_hours + ' ч' : '-'}</td>
                     <td>
                         <div class="btn-group btn-group-sm">
@@ -322,7 +308,7 @@ async function loadProductWorkshops() {
 }
 
 // Функции для сохранения данных
-async function saveMaterialType(id = null) {
+async function saveMaterialType(id = null, version = null) {
     try {
         const name = document.getElementById('materialTypeName').value.trim();
         const lossPercentage = document.getElementById('materialTypeLossPercentage').value;
@@ -338,7 +324,7 @@ async function saveMaterialType(id = null) {
         };
         
         if (id) {
-            await materialTypesAPI.update(id, data);
+            await materialTypesAPI.update(id, data, version);
             showToast('Тип материала обновлен', 'success');
         } else {
             await materialTypesAPI.create(data);
@@ -353,7 +339,7 @@ async function saveMaterialType(id = null) {
     }
 }
 
-async function saveProductType(id = null) {
+async function saveProductType(id = null, version = null) {
     try {
         const name = document.getElementById('productTypeName').value.trim();
         const coefficient = document.getElementById('productTypeCoefficient').value;
@@ -369,7 +355,7 @@ async function saveProductType(id = null) {
         };
         
         if (id) {
-            await productTypesAPI.update(id, data);
+            await productTypesAPI.update(id, data, version);
             showToast('Тип продукции обновлен', 'success');
         } else {
             await productTypesAPI.create(data);
@@ -384,7 +370,7 @@ async function saveProductType(id = null) {
     }
 }
 
-async function saveWorkshop(id = null) {
+async function saveWorkshop(id = null, version = null) {
     try {
         const name = document.getElementById('workshopName').value.trim();
         const workshopType = document.getElementById('workshopType').value.trim();
@@ -402,7 +388,7 @@ async function saveWorkshop(id = null) {
         };
         
         if (id) {
-            await workshopsAPI.update(id, data);
+            await workshopsAPI.update(id, data, version);
             showToast('Цех обновлен', 'success');
         } else {
             await workshopsAPI.create(data);
@@ -417,7 +403,7 @@ async function saveWorkshop(id = null) {
     }
 }
 
-async function saveProduct(id = null) {
+async function saveProduct(id = null, version = null) {
     try {
         const name = document.getElementById('productName').value.trim();
         const productTypeId = document.getElementById('productTypeId').value;
@@ -439,7 +425,7 @@ async function saveProduct(id = null) {
         };
         
         if (id) {
-            await productsAPI.update(id, data);
+            await productsAPI.update(id, data, version);
             showToast('Продукция обновлена', 'success');
         } else {
             await productsAPI.create(data);
@@ -454,7 +440,7 @@ async function saveProduct(id = null) {
     }
 }
 
-async function saveProductWorkshop(id = null) {
+async function saveProductWorkshop(id = null, version = null) {
     try {
         const productId = document.getElementById('productWorkshopProductId').value;
         const workshopId = document.getElementById('productWorkshopWorkshopId').value;
@@ -472,7 +458,7 @@ async function saveProductWorkshop(id = null) {
         };
         
         if (id) {
-            await productWorkshopsAPI.update(id, data);
+            await productWorkshopsAPI.update(id, data, version);
             showToast('Связь обновлена', 'success');
         } else {
             await productWorkshopsAPI.create(data);
@@ -655,7 +641,7 @@ async function loadCalculatorData() {
         });
 
         // Загружаем продукты
-        const products = await productsAPI.getAll();
+        const products = await productsAPI.getAll('id,name,article');
         const productSelect = document.getElementById('product-select');
         productSelect.innerHTML = '<option value="">Выберите продукт для просмотра цехов</option>';
         products.forEach(product => {
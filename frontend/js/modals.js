@@ -30,7 +30,7 @@ function createMaterialTypeModal(materialType = null) {
                     </div>
                     <div class="modal-footer">
                         <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Отмена</button>
-                        <button type="button" class="btn btn-primary" onclick="saveMaterialType(${isEdit ? materialType.id : null})">
+                        <button type="button" class="btn btn-primary" onclick="saveMaterialType(${isEdit ? materialType.id : null}, ${isEdit ? materialType.version : null})">
                             ${isEdit ? 'Сохранить' : 'Добавить'}
                         </button>
                     </div>
@@ -70,7 +70,7 @@ function createProductTypeModal(productType = null) {
                     </div>
                     <div class="modal-footer">
                         <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Отмена</button>
-                        <button type="button" class="btn btn-primary" onclick="saveProductType(${isEdit ? productType.id : null})">
+                        <button type="button" class="btn btn-primary" onclick="saveProductType(${isEdit ? productType.id : null}, ${isEdit ? productType.version : null})">
                             ${isEdit ? 'Сохранить' : 'Добавить'}
                         </button>
                     </div>
@@ -115,7 +115,7 @@ function createWorkshopModal(workshop = null) {
                     </div>
                     <div class="modal-footer">
                         <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Отмена</button>
-                        <button type="button" class="btn btn-primary" onclick="saveWorkshop(${isEdit ? workshop.id : null})">
+                        <button type="button" class="btn btn-primary" onclick="saveWorkshop(${isEdit ? workshop.id : null}, ${isEdit ? workshop.version : null})">
                             ${isEdit ? 'Сохранить' : 'Добавить'}
                         </button>
                     </div>
@@ -183,7 +183,7 @@ function createProductModal(product = null) {
                     </div>
                     <div class="modal-footer">
                         <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Отмена</button>
-                        <button type="button" class="btn btn-primary" onclick="saveProduct(${isEdit ? product.id : null})">
+                        <button type="button" class="btn btn-primary" onclick="saveProduct(${isEdit ? product.id : null}, ${isEdit ? product.version : null})">
                             ${isEdit ? 'Сохранить' : 'Добавить'}
                         </button>
                     </div>
@@ -230,7 +230,7 @@ function createProductWorkshopModal(productWorkshop = null) {
                     </div>
                     <div class="modal-footer">
                         <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Отмена</button>
-                        <button type="button" class="btn btn-primary" onclick="saveProductWorkshop(${isEdit ? productWorkshop.id : null})">
+                        <button type="button" class="btn btn-primary" onclick="saveProductWorkshop(${isEdit ? productWorkshop.id : null}, ${isEdit ? productWorkshop.version : null})">
                             ${isEdit ? 'Сохранить' : 'Добавить'}
                         </button>
                     </div>
@@ -320,7 +320,8 @@ async function loadProductTypesForSelect() {
 
 async function loadProductsForSelect() {
     try {
-        const products = await productsAPI.getAll();
+        // Для списка выбора нужны только ID и название
+        const products = await productsAPI.getAll('id,name');
         const select = document.getElementById('productWorkshopProductId');
         select.innerHTML = '<option value="">Выберите продукцию</option>';
         products.forEach(product => {